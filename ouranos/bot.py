@@ -11,7 +11,7 @@ from loguru import logger
 from ouranos.dpy.command import HelpCommand
 from ouranos.dpy.context import Context
 from ouranos.settings import Settings
-from ouranos.utils import db
+from ouranos.utils import db, http
 from ouranos.utils.emojis import PINGBOI, TICK_RED
 from ouranos.utils.errors import OuranosCommandError, UnexpectedError
 
@@ -145,6 +145,7 @@ class Ouranos(commands.AutoShardedBot):
         """
         self.load_aloc()
         await db.init(self.__db_url)
+        http.init()
         await self.load_cogs(Settings.cogs)
 
     async def cleanup(self):
@@ -152,6 +153,7 @@ class Ouranos(commands.AutoShardedBot):
         Use this for any async tasks to be performed before the bot exits.
         """
         await db.Tortoise.close_connections()
+        await http.close()
 
     async def on_ready(self):
         logger.info(f"Logged in as {self.user}.")
@@ -14,7 +14,7 @@ from tortoise import Tortoise
 
 from ouranos.dpy.cog import Cog
 from ouranos.dpy.command import command, group
-from ouranos.utils import db
+from ouranos.utils import db, http
 from ouranos.utils.checks import bot_admin
 from ouranos.utils.converters import A_OR_B
 from ouranos.utils.format import TableFormatter
@@ -388,6 +388,12 @@ class Admin(Cog):
         """Upload the contents of a text file to Discord."""
         await ctx.send(file=disnake.File(file))
 
+    @command()
+    @bot_admin()
+    async def httpstats(self, ctx):
+        """Show connection pool and request timing stats for the shared HTTP client."""
+        await ctx.send(f"```\n{http.stats()}\n```")
+
     # TODO: hot-reload functionality for imported modules
     # @command(aliases=['reload-module'])
     # @bot_admin()
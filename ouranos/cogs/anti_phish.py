@@ -1,16 +1,28 @@
+import asyncio
+import hashlib
 import re
-from urllib.parse import urlparse, unquote
+import time
+from urllib.parse import urljoin, urlparse, unquote
 
 import aiohttp
 import disnake
-from disnake.ext import commands
+from disnake.ext import commands, tasks
 from loguru import logger
 
 from auth import PHISH_IDENTITY
 from ouranos.dpy.cog import Cog
 from ouranos.dpy.command import command, group
-from ouranos.utils import db
-from ouranos.utils.checks import is_server_mod, server_admin, server_mod
+from ouranos.utils import db, http
+from ouranos.utils.breaker import CircuitBreaker, CircuitOpen
+from ouranos.utils.cache import MISSING, SingleFlight, TTLCache
+from ouranos.utils.checks import bot_admin, is_server_mod, server_admin, server_mod
+from ouranos.utils.domains import (
+    DomainSuffixIndex,
+    load_public_suffixes,
+    normalize_host,
+    normalize_url,
+)
+from ouranos.utils.hash_index import DomainHashIndex
 from ouranos.utils.errors import (
     BotMissingPermission,
     BotRoleHierarchyError,
@@ -18,17 +30,112 @@ from ouranos.utils.errors import (
     OuranosCommandError,
 )
 from ouranos.utils.modlog import LogEvent
+from ouranos.utils.simhash import SimhashIndex, simhash, tokenize
+from ouranos.utils.stats import Timings
 
 PHISH_API = "https://phish.sinking.yachts/v2"
 
+# latency budgets for API calls (seconds). if too many calls fail or run over,
+# the circuit breaker stops calling the API for PHISH_API_RESET_TIMEOUT seconds
+PHISH_API_TIMEOUT = 2
+PHISH_API_SYNC_TIMEOUT = 30
+PHISH_API_RESET_TIMEOUT = 30
+
+# how often the local domain list is synced with the API (seconds)
+SYNC_INTERVAL = 60
+# the API's /recent endpoint only goes back one week, anything older needs a full reload
+MAX_DELTA_SECONDS = 604800
+# on-disk copy of the domain list, shared by every shard process on the host.
+# one process holds the lock, syncs with the API and writes it, the others just map it
+PHISH_INDEX_FILE = "./data/phish_domains.idx"
+
+# verdict cache for API lookups (positive verdicts are much less likely to change)
+VERDICT_CACHE_SIZE = 10000
+VERDICT_TTL_POSITIVE = 24 * 60 * 60
+VERDICT_TTL_NEGATIVE = 15 * 60
+
+# redirect cache for shortened urls (non-redirecting links are cached for less time)
+REDIRECT_CACHE_SIZE = 10000
+REDIRECT_TTL = 6 * 60 * 60
+REDIRECT_TTL_NEGATIVE = 10 * 60
+
+# redirect chains are followed up to MAX_REDIRECT_HOPS deep, with per-hop and total
+# time budgets (seconds)
+MAX_REDIRECT_HOPS = 5
+REDIRECT_HOP_TIMEOUT = 3
+REDIRECT_TOTAL_TIMEOUT = 8
+
+# verdict cache for whole messages, keyed by a hash of the content (spam waves post the
+# same message everywhere). clean verdicts expire quickly so new domains get picked up
+CONTENT_CACHE_SIZE = 5000
+CONTENT_TTL_POSITIVE = 60 * 60
+CONTENT_TTL_NEGATIVE = SYNC_INTERVAL
+
+# max number of redirect/domain lookups in flight at once (across all messages)
+MAX_CONCURRENT_LOOKUPS = 10
+
+# messages that need scanning are queued and handled by a fixed number of workers.
+# when the queue is full, SCAN_OVERFLOW_POLICY decides what gets dropped:
+#   "drop_oldest": drop the oldest queued message to make room
+#   "new_members": only accept messages from members who joined in the last
+#                  NEW_MEMBER_AGE seconds (dropping the oldest), ignore the rest
+SCAN_QUEUE_SIZE = 1000
+SCAN_WORKERS = 8
+SCAN_OVERFLOW_POLICY = "drop_oldest"
+NEW_MEMBER_AGE = 7 * 24 * 60 * 60
+
+# repeated detections for the same user in the same guild within this window (seconds)
+# only get their messages deleted, the user is only banned (and logged) once
+AUTOBAN_COALESCE_WINDOW = 30
+
+# messages with links are also compared against known scam message templates.
+# a message within TEMPLATE_MAX_DISTANCE bits (of 64) of a template isn't banned for that
+# alone, but gets its domains checked with the API even if the local list doesn't have
+# them (yet). messages shorter than TEMPLATE_MIN_TOKENS words are too generic to compare
+TEMPLATE_MAX_DISTANCE = 6
+TEMPLATE_MIN_TOKENS = 8
+# max number of templates each guild learns from its own auto-bans (on top of the seeded ones)
+TEMPLATE_MAX_LEARNED = 200
+
 
 def _load_file(file):
-    with open(file, "r") as f:
+    with open(file, "r", encoding="utf-8") as f:
         return f.read().splitlines()
 
 
 SHORTENERS_FILE = "shorteners.txt"
-SHORTENERS = tuple(_load_file(SHORTENERS_FILE))
+SHORTENERS = DomainSuffixIndex(_load_file(SHORTENERS_FILE))
+
+# well-known benign domains (and their subdomains) that never need a phishing lookup.
+# guilds can add their own with the anti_phish_allowlist config option
+ALLOWLIST = DomainSuffixIndex(
+    [
+        "discord.com",
+        "discord.gg",
+        "discord.media",
+        "discordapp.com",
+        "discordapp.net",
+        "tenor.com",
+        "giphy.com",
+        "youtube.com",
+        "youtu.be",
+        "github.com",
+        "twitter.com",
+        "x.com",
+        "twitch.tv",
+        "reddit.com",
+        "imgur.com",
+        "wikipedia.org",
+        "google.com",
+        "spotify.com",
+        "steampowered.com",
+        "steamcommunity.com",
+    ]
+)
+
+PUBLIC_SUFFIXES = load_public_suffixes()
+
+SCAM_TEMPLATES_FILE = "scam_templates.txt"
 
 URL_PATTERN = re.compile(
     # r"http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*(),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+"
@@ -38,18 +145,89 @@ URL_PATTERN = re.compile(
 REMOVE_EXTRA_SLASHES = re.compile(r"(https?://)/+")  # remove everything not inside group
 
 
+def might_contain_url(content):
+    """Cheap check for whether get_domains could find anything in a message.
+
+    Without "http" there's nothing for URL_PATTERN to match, unless it gets
+    revealed by unquoting (needs a "%") or by stripping NUL chars.
+    """
+    return "http" in content or "%" in content or "\u0000" in content
+
+
 class AntiPhish(Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.session = aiohttp.ClientSession()
+        self.session = http.get_session()
+
+        # local copy of the phishing domain list, kept up to date by _sync_phish_domains
+        self.phish_domains = set()
+        self.domain_index = DomainHashIndex(PHISH_INDEX_FILE)
+        self._last_sync = None
+
+        # {domain: bool}
+        self.verdict_cache = TTLCache(VERDICT_CACHE_SIZE, VERDICT_TTL_NEGATIVE)
+        # {normalized_url: location or None}
+        self.redirect_cache = TTLCache(REDIRECT_CACHE_SIZE, REDIRECT_TTL)
+        # {content_hash: (domain, from_redirect)}
+        self.content_cache = TTLCache(CONTENT_CACHE_SIZE, CONTENT_TTL_NEGATIVE)
+        # {guild_id: (allowlist config string, DomainSuffixIndex)}
+        self._guild_allowlists = {}
+        self.allowlist_hits = 0
+        self._lookup_semaphore = asyncio.Semaphore(MAX_CONCURRENT_LOOKUPS)
+        # shares in-flight requests between concurrent lookups of the same domain/url
+        self._single_flight = SingleFlight()
+        self.api_breaker = CircuitBreaker(
+            "phishing API", PHISH_API_TIMEOUT, reset_timeout=PHISH_API_RESET_TIMEOUT
+        )
+
+        # (message, message before edit or None, time queued)
+        self._scan_queue = asyncio.Queue(SCAN_QUEUE_SIZE)
+        self._scan_workers = [
+            asyncio.create_task(self._scan_worker()) for _ in range(SCAN_WORKERS)
+        ]
+        self.scans_dropped = 0
+        self.scan_wait_times = Timings()
+        self.scan_times = Timings()
+        # detection -> message deleted, and message sent -> message deleted
+        self.delete_latencies = Timings()
+        self.removal_times = Timings()
+        # {(guild_id, user_id): True}
+        self._recent_autobans = TTLCache(10000, AUTOBAN_COALESCE_WINDOW)
+        self.autobans_coalesced = 0
+        # edits that didn't add any new links
+        self.edits_skipped = 0
+
+        # fingerprints of known scam messages, seeded from SCAM_TEMPLATES_FILE
+        self.templates = SimhashIndex(TEMPLATE_MAX_DISTANCE)
+        # {guild_id: SimhashIndex} of messages that got someone auto-banned in that guild
+        self._learned_templates = {}
+        for line in _load_file(SCAM_TEMPLATES_FILE):
+            if line.strip() and not line.startswith("#"):
+                # same minimum as messages, a shorter template could never match
+                fingerprint = self._fingerprint(line)
+                if fingerprint is None:
+                    logger.warning(f"scam template too short, skipping: {line.strip()}")
+                    continue
+                self.templates.seed(fingerprint, "seeded")
+        self.template_hits = 0
+        self.template_confirmations = 0
+        self.templates_learned = 0
+
+        self._sync_phish_domains.start()
 
     def cog_unload(self):
+        self._sync_phish_domains.cancel()
         self.bot.loop.create_task(self.cleanup())
 
     async def cleanup(self):
-        await self.session.close()
+        for worker in self._scan_workers:
+            worker.cancel()
+        self.domain_index.close()
 
     def get_domains(self, content):
+        if not might_contain_url(content):
+            return set(), set()
+
         content = content.replace("\u0000", "")  # NUL char handling (temp fix) (TODO)
         content = unquote(content)  # handle urlquoted domains (ugh)
         content = REMOVE_EXTRA_SLASHES.sub(r"\1", content)
@@ -62,27 +240,177 @@ class AntiPhish(Cog):
         for url in urls:
             parsed = urlparse(url)
             if parsed.netloc:
-                if parsed.netloc.startswith(SHORTENERS):
+                if parsed.netloc in SHORTENERS:
                     to_follow.add(url)
                 else:
-                    domains.add(parsed.netloc)
+                    domains.add(normalize_host(parsed.netloc))
 
         if "" in domains:
             domains.remove("")
 
         return domains, to_follow
 
-    async def is_phish_domain(self, domain):
-        async with self.session.get(
-            f"{PHISH_API}/check/{domain}", headers=PHISH_IDENTITY
-        ) as resp:
+    async def _get_json(self, url):
+        async with self.session.get(url, headers=PHISH_IDENTITY) as resp:
             resp.raise_for_status()
             return await resp.json()
 
-    async def follow_redirect(self, url):
-        async with self.session.get(url, allow_redirects=False) as resp:
-            if 300 <= resp.status < 400:
-                return resp.headers["Location"]
+    async def fetch_all_domains(self):
+        return await self.api_breaker.call(
+            self._get_json, f"{PHISH_API}/all", timeout=PHISH_API_SYNC_TIMEOUT
+        )
+
+    async def fetch_recent_changes(self, seconds):
+        return await self.api_breaker.call(
+            self._get_json,
+            f"{PHISH_API}/recent/{seconds}",
+            timeout=PHISH_API_SYNC_TIMEOUT,
+        )
+
+    @tasks.loop(seconds=SYNC_INTERVAL)
+    async def _sync_phish_domains(self):
+        # tasks.loop stops on unhandled errors, so log them and try again next time
+        try:
+            await self.sync_phish_domains()
+        except CircuitOpen:
+            logger.warning("phishing API unavailable, skipping domain sync")
+        except Exception:
+            logger.exception("phishing domain sync failed")
+
+    def _is_index_writer(self):
+        try:
+            return self.domain_index.acquire_writer_lock()
+        except OSError:
+            logger.exception("unable to lock phishing domain index, syncing without it")
+            return True
+
+    async def _write_index(self):
+        # hashing the whole list takes a while, keep it off the event loop
+        domains = list(self.phish_domains)
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                None, self.domain_index.write, domains
+            )
+        except OSError:
+            logger.exception("failed to write phishing domain index")
+
+    async def sync_phish_domains(self):
+        # another process is keeping the index up to date, just pick up new versions
+        if not self._is_index_writer():
+            if self.domain_index.refresh():
+                self._last_sync = self.domain_index.mtime
+                logger.debug(f"mapped {len(self.domain_index)} phishing domains")
+            return
+
+        # until the first full reload succeeds, keep using whatever index is on disk
+        # (left by a previous run, or by the writer we took over from)
+        if not self.phish_domains:
+            self.domain_index.refresh()
+            if self.domain_index and self._last_sync is None:
+                self._last_sync = self.domain_index.mtime
+
+        now = time.time()
+
+        # full reload on startup (or after taking over from another writer),
+        # or if we've been out of sync for too long
+        if (
+            self._last_sync is None
+            or not self.phish_domains
+            or now - self._last_sync > MAX_DELTA_SECONDS
+        ):
+            domains = await self.fetch_all_domains()
+            self.phish_domains = {normalize_host(d) for d in domains}
+            self._last_sync = now
+            logger.info(f"loaded {len(self.phish_domains)} phishing domains")
+            await self._write_index()
+            return
+
+        # otherwise only apply what changed since the last sync (with some overlap)
+        seconds = int(now - self._last_sync) + SYNC_INTERVAL
+        added = removed = 0
+        for change in await self.fetch_recent_changes(seconds):
+            domains = {normalize_host(d) for d in change["domains"]}
+            if change["type"] == "add":
+                added += len(domains)
+                self.phish_domains.update(domains)
+            elif change["type"] == "delete":
+                removed += len(domains)
+                self.phish_domains.difference_update(domains)
+        self._last_sync = now
+
+        if added or removed:
+            logger.debug(f"phishing domain sync: {added} added, {removed} removed")
+            await self._write_index()
+
+    def is_listed(self, domain):
+        # the writer has its own copy, once it's loaded
+        if self.phish_domains or not self.domain_index:
+            return domain in self.phish_domains
+        return domain in self.domain_index
+
+    async def _check_api(self, domain):
+        return await self._single_flight.do(
+            ("check", domain),
+            self.api_breaker.call,
+            self._get_json,
+            f"{PHISH_API}/check/{domain}",
+        )
+
+    def _is_listed_locally(self, domain):
+        # a listed domain covers all of its subdomains
+        return any(self.is_listed(d) for d in PUBLIC_SUFFIXES.lookup_candidates(domain))
+
+    async def _api_verdict(self, domain):
+        """Asks the API about a domain (cached), None if it couldn't be reached."""
+        verdict = self.verdict_cache.get(domain)
+        if verdict is MISSING:
+            try:
+                verdict = await self._check_api(domain)
+            except (CircuitOpen, aiohttp.ClientError, asyncio.TimeoutError):
+                return None
+            ttl = VERDICT_TTL_POSITIVE if verdict else VERDICT_TTL_NEGATIVE
+            self.verdict_cache.set(domain, verdict, ttl)
+        return verdict
+
+    async def is_phish_domain(self, domain):
+        # only fall back to the API if the initial sync hasn't succeeded yet
+        if self._last_sync is None:
+            verdict = await self._api_verdict(domain)
+            if verdict is None:
+                # the API is slow or down, make do with whatever we have locally
+                return self._is_listed_locally(domain)
+            return verdict
+
+        return self._is_listed_locally(domain)
+
+    async def follow_redirect(self, url, timeout=REDIRECT_HOP_TIMEOUT):
+        """Follows a single redirect, returning the absolute Location or None."""
+        key = normalize_url(url)
+        location = self.redirect_cache.get(key)
+        if location is MISSING:
+            location = await self._single_flight.do(
+                ("redirect", key), self._do_follow_redirect, url, timeout
+            )
+            ttl = REDIRECT_TTL if location else REDIRECT_TTL_NEGATIVE
+            self.redirect_cache.set(key, location, ttl)
+        return location
+
+    async def _do_follow_redirect(self, url, timeout):
+        timeout = aiohttp.ClientTimeout(total=timeout)
+
+        # HEAD avoids downloading a body we don't need, but not every server supports it
+        async with self.session.head(
+            url, allow_redirects=False, timeout=timeout
+        ) as resp:
+            status, location = resp.status, resp.headers.get("Location")
+        if status in (405, 501):
+            async with self.session.get(
+                url, allow_redirects=False, timeout=timeout
+            ) as resp:
+                status, location = resp.status, resp.headers.get("Location")
+
+        if 300 <= status < 400 and location:
+            return urljoin(url, location)
 
     async def _do_auto_ban(self, guild, user, message, domain, from_redirect):
         """Automatically bans a user and dispatches the event to the modlog."""
@@ -110,67 +438,315 @@ class AntiPhish(Cog):
         reason = f"Phishing link detected ({reason_domain})"
         await LogEvent("autoban", guild, user, mod, reason, None, duration).dispatch()
 
-    async def process_phishing(self, content):
-        # runs regex to find URLs and uses urlparse to extract domain for each
-        domains, to_follow = self.get_domains(content)
+    async def _check_domain(self, domain, from_redirect=None):
+        async with self._lookup_semaphore:
+            is_phish = await self.is_phish_domain(domain)
+        return (domain, from_redirect) if is_phish else None
+
+    async def get_guild_allowlist(self, guild):
+        config = await db.get_config(guild) if guild else None
+        if not (config and config.anti_phish_allowlist):
+            return None
+        raw = config.anti_phish_allowlist
+        cached = self._guild_allowlists.get(guild.id)
+        if not cached or cached[0] != raw:
+            cached = (raw, DomainSuffixIndex(raw.split()))
+            self._guild_allowlists[guild.id] = cached
+        return cached[1]
+
+    def is_allowlisted(self, domain, guild_allowlist=None):
+        if domain in ALLOWLIST or (guild_allowlist and domain in guild_allowlist):
+            self.allowlist_hits += 1
+            return True
+        return False
+
+    async def _check_redirect(self, url, guild_allowlist=None):
+        """Follows a redirect chain, checking the domain of every hop along the way.
+
+        Only hops to another shortener get followed; anything else (including
+        allowlisted hosts and IP addresses) is checked and never requested.
+        Stops at the first phishing domain, after MAX_REDIRECT_HOPS hops,
+        or when the time budget runs out.
+        """
+        old_url_parsed = urlparse(url)
+        from_redirect = old_url_parsed.netloc + old_url_parsed.path
+
+        seen = {normalize_url(url)}
+        checked = set()
+        deadline = time.monotonic() + REDIRECT_TOTAL_TIMEOUT
+
+        for _ in range(MAX_REDIRECT_HOPS):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                async with self._lookup_semaphore:
+                    url = await self.follow_redirect(
+                        url, min(REDIRECT_HOP_TIMEOUT, remaining)
+                    )
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.debug(f"failed to follow redirect for {url}: {e!r}")
+                break
+            if not url or (key := normalize_url(url)) in seen:
+                break
+            seen.add(key)
+
+            new_domain = normalize_host(urlparse(url).netloc)
+            if not new_domain or self.is_allowlisted(new_domain, guild_allowlist):
+                break
+            if new_domain not in checked:
+                checked.add(new_domain)
+                result = await self._check_domain(new_domain, from_redirect)
+                if result:
+                    return result
+
+            # never request the destination itself, only more shortener hops
+            if new_domain not in SHORTENERS:
+                break
+
+    @staticmethod
+    def _content_key(content):
+        # collapse whitespace so trivially reformatted copies still match
+        normalized = " ".join(content.split())
+        return hashlib.blake2b(normalized.encode(), digest_size=16).digest()
+
+    async def process_phishing(self, content, guild=None):
+        if not might_contain_url(content):
+            return None, None
+
+        guild_allowlist = await self.get_guild_allowlist(guild)
+        key = self._content_key(content)
+        if guild_allowlist:  # the verdict depends on this guild's allowlist
+            key = (guild.id, key)
+
+        verdict = self.content_cache.get(key)
+        if verdict is MISSING:
+            # runs regex to find URLs and uses urlparse to extract domain for each
+            domains, to_follow = self.get_domains(content)
+            verdict = await self.check_domains(
+                domains, to_follow, guild_allowlist, content, guild
+            )
+            ttl = CONTENT_TTL_POSITIVE if verdict[0] else CONTENT_TTL_NEGATIVE
+            self.content_cache.set(key, verdict, ttl)
+        return verdict
+
+    async def check_domains(
+        self, domains, to_follow, guild_allowlist=None, content=None, guild=None
+    ):
+        # allowlisted domains (and short links on them, like youtu.be) skip every
+        # cache and network lookup
+        domains = {d for d in domains if not self.is_allowlisted(d, guild_allowlist)}
+        to_follow = {
+            u
+            for u in to_follow
+            if not self.is_allowlisted(
+                normalize_host(urlparse(u).netloc), guild_allowlist
+            )
+        }
 
         if not (domains or to_follow):
             return None, None
 
-        # follow redirects and add those domains to the list
-        # note: this implementation only follows redirects one level deep (intentional)
-        domains_from_redirect = {}
-        for url in to_follow:
-            new_url = await self.follow_redirect(url)
-            if new_url:
-                new_domain = urlparse(new_url).netloc
-                if new_domain:
-                    if new_domain not in domains_from_redirect:
-                        old_url_parsed = urlparse(url)
-                        domains_from_redirect[new_domain] = (
-                            old_url_parsed.netloc + old_url_parsed.path
-                        )
-                    domains.add(new_domain)
-
-        # check API and ban if phishing
-        for domain in domains:
-            if await self.is_phish_domain(domain):
-                from_redirect = domains_from_redirect.get(domain)
-                return domain, from_redirect
+        # check every domain and follow every redirect concurrently,
+        # the first phishing domain found wins and cancels the rest
+        pending = {asyncio.create_task(self._check_domain(d)) for d in domains}
+        pending |= {
+            asyncio.create_task(self._check_redirect(u, guild_allowlist))
+            for u in to_follow
+        }
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    result = task.result()
+                    if result:
+                        return result
+        finally:
+            for task in pending:
+                task.cancel()
+
+        # looks like a known scam message, so its domains might just not have made it
+        # into the local list yet. only a listed domain gets anyone banned though
+        # (before the first sync, every domain was already checked with the API)
+        synced = self._last_sync is not None
+        if synced and content and self.match_template(content, guild):
+            self.template_hits += 1
+            for domain in sorted(domains):
+                if await self._api_verdict(domain):
+                    self.template_confirmations += 1
+                    return domain, None
 
         return None, None
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        config = await db.get_config(message.guild)
-        if not (config and config.anti_phish):
-            return
+    async def _should_scan(self, message):
+        # most messages don't have links, so skip them before doing anything expensive
+        if not might_contain_url(message.content):
+            return False
 
         # ignore messages that don't give us a Member
         # this is here to avoid an error where the message author is missing
         # guild permissions for some reason
         if not isinstance(message.author, disnake.Member):
-            return
+            return False
+
+        config = await db.get_config(message.guild)
+        if not (config and config.anti_phish):
+            return False
 
         # ignore server moderators
-        if await is_server_mod(message.author):
+        return not await is_server_mod(message.author)
+
+    @staticmethod
+    def _fingerprint(content):
+        tokens = tokenize(content)
+        if len(tokens) < TEMPLATE_MIN_TOKENS:
+            return None
+        return simhash(tokens)
+
+    def match_template(self, content, guild=None):
+        fingerprint = self._fingerprint(content)
+        if fingerprint is None:
+            return False
+        if self.templates.match(fingerprint) is not None:
+            return True
+        learned = self._learned_templates.get(guild.id) if guild else None
+        return learned is not None and learned.match(fingerprint) is not None
+
+    def learn_template(self, content, domain, guild):
+        # only for the guild it happened in, what counts as a scam message in one
+        # community can be ordinary chat in another
+        fingerprint = self._fingerprint(content)
+        if fingerprint is None or self.templates.match(fingerprint) is not None:
             return
+        learned = self._learned_templates.get(guild.id)
+        if learned is None:
+            learned = self._learned_templates[guild.id] = SimhashIndex(
+                TEMPLATE_MAX_DISTANCE, TEMPLATE_MAX_LEARNED
+            )
+        if learned.learn(fingerprint, domain):
+            self.templates_learned += 1
 
-        domain, from_redirect = await self.process_phishing(message.content)
+    @commands.Cog.listener()
+    async def on_message(self, message):
+        if await self._should_scan(message):
+            self._enqueue_scan(message)
 
-        if domain:
-            try:
-                return await self._do_auto_ban(
-                    message.guild, message.author, message, domain, from_redirect
-                )
-            except OuranosCommandError:
+    @commands.Cog.listener()
+    async def on_message_edit(self, before, after):
+        # embeds being resolved also count as an edit
+        if before.content == after.content:
+            return
+        if await self._should_scan(after):
+            self._enqueue_scan(after, before)
+
+    def _is_new_member(self, member):
+        if not member.joined_at:
+            return False
+        age = disnake.utils.utcnow() - member.joined_at
+        return age.total_seconds() < NEW_MEMBER_AGE
+
+    def _enqueue_scan(self, message, before=None):
+        if self._scan_queue.full():
+            new_members_only = SCAN_OVERFLOW_POLICY == "new_members"
+            if new_members_only and not self._is_new_member(message.author):
+                self.scans_dropped += 1
                 return
 
+            # make room by dropping the oldest queued message
+            self._scan_queue.get_nowait()
+            self._scan_queue.task_done()
+            self.scans_dropped += 1
+
+        self._scan_queue.put_nowait((message, before, time.monotonic()))
+
+    async def _scan_worker(self):
+        while True:
+            message, before, queued_at = await self._scan_queue.get()
+            try:
+                started_at = time.monotonic()
+                self.scan_wait_times.add(started_at - queued_at)
+                if before is None:
+                    await self.scan_message(message)
+                else:
+                    await self.scan_edit(before, message)
+                self.scan_times.add(time.monotonic() - started_at)
+            except Exception:
+                logger.exception(f"Error scanning message {message.id} for phishing:")
+            finally:
+                self._scan_queue.task_done()
+
+    async def scan_message(self, message):
+        domain, from_redirect = await self.process_phishing(
+            message.content, message.guild
+        )
+        if domain:
+            await self._handle_detection(message, domain, from_redirect)
+
+    async def scan_edit(self, before, after):
+        # the links that were already there got checked when the message was sent,
+        # so only look at the ones the edit added
+        old_domains, old_to_follow = self.get_domains(before.content)
+        domains, to_follow = self.get_domains(after.content)
+        domains -= old_domains
+        to_follow -= old_to_follow
+        if not (domains or to_follow):
+            self.edits_skipped += 1
+            return
+
+        guild_allowlist = await self.get_guild_allowlist(after.guild)
+        domain, from_redirect = await self.check_domains(
+            domains, to_follow, guild_allowlist, after.content, after.guild
+        )
+        if domain:
+            await self._handle_detection(after, domain, from_redirect)
+
+    async def _handle_detection(self, message, domain, from_redirect):
+        # get the link out of the channel right away, don't wait for the ban
+        detected_at = time.monotonic()
+        await asyncio.gather(
+            self._delete_phishing_message(message, detected_at),
+            self._try_auto_ban(message, domain, from_redirect),
+        )
+
+    async def _delete_phishing_message(self, message, detected_at):
+        try:
+            await message.delete()
+        except (disnake.Forbidden, disnake.NotFound):
+            return
+        self.delete_latencies.add(time.monotonic() - detected_at)
+        self.removal_times.add(
+            (disnake.utils.utcnow() - message.created_at).total_seconds()
+        )
+
+    async def _try_auto_ban(self, message, domain, from_redirect):
+        # compromised accounts tend to post the same link in every channel at once
+        key = (message.guild.id, message.author.id)
+        if key in self._recent_autobans:
+            self.autobans_coalesced += 1
+            return
+        self._recent_autobans.set(key, True)
+
+        try:
+            await self._do_auto_ban(
+                message.guild, message.author, message, domain, from_redirect
+            )
+        except OuranosCommandError:
+            return
+        except Exception:
+            # let the next detection try again
+            self._recent_autobans.pop(key)
+            raise
+
+        # the domain was confirmed as phishing, so remember what the message looked like
+        self.learn_template(message.content, domain, message.guild)
+
     @command()
     @server_mod()
     async def test_antiphish(self, ctx, *, content):
         """Test anti-phish system."""
-        domain, from_redirect = await self.process_phishing(content)
+        domain, from_redirect = await self.process_phishing(content, ctx.guild)
 
         if domain:
             await ctx.send(
@@ -180,6 +756,40 @@ class AntiPhish(Cog):
         else:
             await ctx.send("No phishing domains detected.")
 
+    @command()
+    @bot_admin()
+    async def phishstats(self, ctx):
+        """View anti-phish cache and sync statistics."""
+        last_sync = (
+            f"{time.time() - self._last_sync:.0f}s ago" if self._last_sync else "never"
+        )
+        if self.domain_index.is_writer:
+            domains = f"{len(self.phish_domains)} (index writer)"
+        else:
+            domains = f"{len(self.domain_index)} (mapped from index)"
+        await ctx.send(
+            f"```\n"
+            f"domains: {domains} (last sync {last_sync})\n"
+            f"verdict cache: {self.verdict_cache.stats()}\n"
+            f"redirect cache: {self.redirect_cache.stats()}\n"
+            f"content cache: {self.content_cache.stats()}\n"
+            f"allowlist: {self.allowlist_hits} lookups skipped\n"
+            f"single-flight: {self._single_flight.stats()}\n"
+            f"API breaker: {self.api_breaker.stats()}\n"
+            f"scan queue: {self._scan_queue.qsize()}/{SCAN_QUEUE_SIZE}, "
+            f"dropped {self.scans_dropped}\n"
+            f"scan wait: {self.scan_wait_times.show()}\n"
+            f"scan time: {self.scan_times.show()}\n"
+            f"detection to delete: {self.delete_latencies.show()}\n"
+            f"sent to delete: {self.removal_times.show()}\n"
+            f"auto-bans coalesced: {self.autobans_coalesced}\n"
+            f"edits without new links: {self.edits_skipped}\n"
+            f"scam templates: {len(self.templates)} seeded, "
+            f"{self.templates_learned} learned in {len(self._learned_templates)} guilds, "
+            f"{self.template_hits} matches, {self.template_confirmations} confirmed\n"
+            f"```"
+        )
+
 
 def setup(bot):
     bot.add_cog(AntiPhish(bot))
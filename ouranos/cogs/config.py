@@ -8,6 +8,8 @@ from ouranos.dpy.command import command, group
 from ouranos.settings import Settings
 from ouranos.utils import db
 from ouranos.utils.checks import is_bot_admin, server_admin
+from ouranos.utils.converters import A_OR_B
+from ouranos.utils.domains import load_public_suffixes, normalize_host
 from ouranos.utils.emojis import TICK_GREEN, TICK_RED, TICK_YELLOW
 
 
@@ -21,6 +23,11 @@ def config_exists(exists=True):
     return commands.check(pred)
 
 
+class AddOrRemove(A_OR_B):
+    OPTION_A = "add"
+    OPTION_B = "remove"
+
+
 class Zero(commands.Converter):
     """Resets a configuration setting."""
 
@@ -67,6 +74,7 @@ class Config(Cog):
             f"mod_role: {config.mod_role_id}\n"
             f"dm_on_infraction: {config.dm_on_infraction}\n"
             f"anti_phish: {config.anti_phish}\n"
+            f"anti_phish_allowlist: {config.anti_phish_allowlist or '<not defined>'}\n"
             f"custom_kick_message: {custom_kick_message}\n"
             f"custom_ban_message: {custom_ban_message}\n"
             f"```"
@@ -188,6 +196,49 @@ class Config(Cog):
         await db.update_config(config=config, anti_phish=new_setting)
         await ctx.send(f"{TICK_GREEN} anti_phish updated.")
 
+    @configure.command(aliases=["anti-phish-allowlist"])
+    @server_admin()
+    @config_exists(True)
+    async def anti_phish_allowlist(
+        self, ctx, add_or_remove: AddOrRemove = None, domain=None
+    ):
+        """Add or remove domains anti_phish should ignore (subdomains included)."""
+        config = await db.get_config(ctx.guild)
+        allowlist = config.anti_phish_allowlist.split()
+
+        # view
+        if add_or_remove is None or not domain:
+            return await ctx.send(
+                f"anti_phish_allowlist: `{' '.join(allowlist) or '<not defined>'}`"
+            )
+
+        domain = domain.partition("://")[2] if "://" in domain else domain
+        domain = domain.rstrip("/")
+        has_path = any(c in domain for c in "/?#")
+        domain = normalize_host(domain)
+        # add
+        if add_or_remove is True:
+            if has_path:
+                return await ctx.send(
+                    f"{TICK_RED} Only domains can be allowed, not links to a page."
+                )
+            if not load_public_suffixes().registrable_domain(domain):
+                return await ctx.send(
+                    f"{TICK_RED} That's not a domain you can allow "
+                    f"(a public suffix like `com` would allow everything under it)."
+                )
+            if domain in allowlist:
+                return await ctx.send(f"{TICK_RED} That domain is already allowed!")
+            allowlist.append(domain)
+        # remove
+        else:
+            if domain not in allowlist:
+                return await ctx.send(f"{TICK_RED} That domain is not allowed!")
+            allowlist.remove(domain)
+
+        await db.update_config(config=config, anti_phish_allowlist=" ".join(allowlist))
+        await ctx.send(f"{TICK_GREEN} anti_phish_allowlist updated.")
+
     @configure.command(aliases=["custom-kick-message"])
     @server_admin()
     @config_exists(True)
@@ -1,4 +1,5 @@
 import asyncio
+import datetime
 import io
 import shlex
 import time
@@ -13,7 +14,7 @@ from ouranos.dpy.cog import Cog
 from ouranos.dpy.command import command, group
 from ouranos.utils import db, modlog
 from ouranos.utils.better_argparse import Parser
-from ouranos.utils.checks import server_admin, server_mod
+from ouranos.utils.checks import bot_admin, server_admin, server_mod
 from ouranos.utils.converters import (
     Duration,
     InfractionID,
@@ -32,6 +33,7 @@ from ouranos.utils.errors import (
 )
 from ouranos.utils.format import TableFormatter, approximate_timedelta, exact_timedelta
 from ouranos.utils.modlog import LogEvent, MassActionLogEvent, SmallLogEvent
+from ouranos.utils.stats import Timings
 
 LOGS = {
     "note": modlog.log_note,
@@ -62,12 +64,40 @@ BAN = disnake.AuditLogAction.ban
 UNBAN = disnake.AuditLogAction.unban
 KICK = disnake.AuditLogAction.kick
 
-
-class FetchedAuditLogEntry:
-    def __init__(self, guild_id, key, the_real_entry):
-        self.guild_id = guild_id
-        self.key = key
-        self.the_real_entry = the_real_entry
+# how long (seconds) fetch_audit_log_entry waits for an entry
+AUDIT_LOG_TIMEOUT = 30
+
+# resolve audit log entries from gateway events (needs the bans/moderation intent),
+# and only poll the audit log for requests that weren't resolved within the grace period
+USE_GATEWAY_AUDIT_LOG = True
+GATEWAY_GRACE_PERIOD = 5
+# max audit log entries the poller reads from a guild in one pass
+AUDIT_LOG_PAGE_SIZE = 100
+# entries that arrive before anyone asks for them are kept around for a bit. room for a
+# whole page, since the cursor moves past everything a pass reads
+RECENT_ENTRIES_PER_GUILD = AUDIT_LOG_PAGE_SIZE
+RECENT_ENTRY_MAX_AGE = 60
+# the poller only asks for entries newer than the newest one it has seen (if that's
+# recent enough to matter, otherwise it just reads the newest few entries again)
+AUDIT_CURSOR_MAX_AGE = RECENT_ENTRY_MAX_AGE
+
+# guilds whose audit logs are fetched at the same time (each guild has its own rate limit)
+MAX_CONCURRENT_AUDIT_FETCHES = 5
+# how long (seconds) to leave a guild alone after it got rate limited, if discord doesn't say
+DEFAULT_RATE_LIMIT_COOLDOWN = 5
+
+# the poller sleeps until a lookup is requested, then waits this long (seconds) so
+# lookups from the same burst (e.g. a mass ban) share one audit log fetch
+AUDIT_BATCH_WINDOW = 0.5
+# min time between two fetches of the same guild's audit log. a guild whose entries
+# weren't there yet (or whose fetch failed) waits twice as long for every pass in a row
+# that missed, up to the max
+MIN_GUILD_FETCH_INTERVAL = 1
+MAX_MISS_BACKOFF = 8
+# when polling, a kick that isn't in the audit log after this long means the member left
+KICK_ENTRY_WAIT = 3
+
+HISTOGRAM_BOUNDS = (0.01, 0.1, 0.5, 1, 2, 5, 10)
 
 
 class ReasonNoteDuration(Options):
@@ -89,8 +119,41 @@ class Modlog(Cog):
         self._last_case_id_cache = {}
         self._last_audit_id_cache = {}
 
-        # (guild_id, user_id)
-        self._audit_log_queue = deque()
+        # {guild_id: {(action_type, user_id): (check, time requested)}}
+        self._audit_log_requests = defaultdict(dict)
+        # {guild_id: deque of recent AuditLogEntry (from the gateway or the poller) nobody claimed}
+        self._recent_audit_entries = defaultdict(
+            lambda: deque(maxlen=RECENT_ENTRIES_PER_GUILD)
+        )
+        # {guild_id: id of the newest audit log entry the poller has read}
+        self._audit_log_cursors = {}
+        self.entries_from_gateway = 0
+        self.entries_from_polling = 0
+        self.entries_from_cache = 0
+        self.correlation_times = Timings()
+        # {(guild_id, action_type, user_id): Future}, resolved with the entry (or None)
+        self._audit_log_waiters = {}
+        # {(guild_id, action_type, user_id): number of callers waiting on that future}
+        self._audit_log_waiter_counts = {}
+        self.peak_waiters = 0
+        self.waiter_timeouts = 0
+
+        self._audit_fetch_semaphore = asyncio.Semaphore(MAX_CONCURRENT_AUDIT_FETCHES)
+        # {guild_id: Task} for guilds whose audit log is being fetched right now
+        self._audit_fetch_tasks = {}
+        # {guild_id: time.monotonic() until which the guild shouldn't be fetched}
+        self._audit_fetch_cooldowns = {}
+        self._audit_fetch_global_cooldown = 0
+        # {guild_id: passes in a row that failed or didn't find everything}
+        self._audit_miss_streaks = defaultdict(int)
+        # set whenever a lookup is requested, wakes up the poller
+        self._audit_requests_added = asyncio.Event()
+        # lookup requested -> picked up by the poller
+        self.queue_times = Timings()
+        # {guild_id: Timings}
+        self.audit_fetch_times = defaultdict(lambda: Timings(100))
+        self.audit_fetch_errors = defaultdict(int)  # {guild_id: count}
+        self.audit_fetch_rate_limits = defaultdict(int)  # {guild_id: count}
         # {guild_id: {}}
         self._mod_action_cache = defaultdict(lambda: defaultdict(dict))
 
@@ -134,112 +197,390 @@ class Modlog(Cog):
     async def _audit_log_fetcher_loop(self):
         await self.bot.wait_until_ready()
         logger.info("starting audit log fetcher loop")
-        default_sleep = 1.5
-        last_run = False
 
         while True:
-            found, missed = await self._audit_log_fetcher()
-            t = (
-                default_sleep
-                + 2 * (found > 0) * last_run
-                + int(found / 30)
-                + 5 * (missed > 0)
-            )
-            last_run = bool(found + missed)
-            if t != default_sleep:
-                logger.info(f"sleeping {t} seconds")
-            await asyncio.sleep(t)
+            self._audit_requests_added.clear()
+            delay = self._next_fetch_in()
+            if delay != 0:
+                # sleep until a lookup is due, or a new one comes in
+                try:
+                    await asyncio.wait_for(self._audit_requests_added.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._audit_log_fetcher()
+
+    @property
+    def gateway_mode(self):
+        return USE_GATEWAY_AUDIT_LOG and self.bot.intents.bans
+
+    def _request_due_at(self, guild_id, requested_at):
+        """When the poller should handle a lookup (in time.monotonic() terms)."""
+        wait = GATEWAY_GRACE_PERIOD if self.gateway_mode else AUDIT_BATCH_WINDOW
+        return max(
+            requested_at + wait,
+            self._audit_fetch_cooldowns.get(guild_id, 0),
+            self._audit_fetch_global_cooldown,
+        )
 
-    async def _audit_log_fetcher(self):
-        to_check = defaultdict(dict)
-        t0 = time.monotonic()
+    def _next_fetch_in(self):
+        """Seconds until the next lookup is due, or None if there's nothing to do."""
+        due_at = [
+            self._request_due_at(guild_id, requested_at)
+            for guild_id, requests in self._audit_log_requests.items()
+            if guild_id not in self._audit_fetch_tasks
+            for _, requested_at in requests.values()
+        ]
+        if not due_at:
+            return None
+        return max(0, min(due_at) - time.monotonic())
+
+    def _pop_waiter(self, waiter_key):
+        self._audit_log_waiter_counts.pop(waiter_key, None)
+        return self._audit_log_waiters.pop(waiter_key, None)
+
+    def _dispatch_audit_log_entry(self, guild_id, key, entry):
+        future = self._pop_waiter((guild_id, *key))
+        if future and not future.done():
+            future.set_result(entry)
+
+    def _fail_requests(self, guild_id, infractions, error):
+        """Gives up on lookups that can't be answered. Like on a timeout,
+        kicks resolve to None (the member left) and everything else raises."""
+        for key in infractions:
+            future = self._pop_waiter((guild_id, *key))
+            if future and not future.done():
+                if key[0] == KICK:
+                    future.set_result(None)
+                else:
+                    future.set_exception(error)
+        infractions.clear()
 
-        # clear the queue
-        while True:
-            try:
-                action_type, guild_id, user_id, check = self._audit_log_queue.pop()
-                to_check[guild_id][action_type, user_id] = check
-            except IndexError:
-                break
+    def _back_off(self, guild_id, now):
+        streak = self._audit_miss_streaks[guild_id] = (
+            self._audit_miss_streaks[guild_id] + 1
+        )
+        backoff = min(MAX_MISS_BACKOFF, MIN_GUILD_FETCH_INTERVAL * 2**streak)
+        # don't cut a longer rate limit short
+        self._audit_fetch_cooldowns[guild_id] = max(
+            self._audit_fetch_cooldowns.get(guild_id, 0), now + backoff
+        )
 
-        # make audit requests
+    def _resolve_requests(self, guild_id, infractions, entry):
+        """Resolves the requests in infractions that entry answers.
+        Returns (found, discarded)."""
         found = discarded = 0
-        for guild_id, infractions in to_check.items():
-            guild = self.bot.get_guild(guild_id)
-
-            async for entry in guild.audit_logs(limit=5 + 2 * len(infractions)):
-                if entry.action not in [KICK, MUTE, BAN, UNBAN]:
+        if entry.action not in [KICK, MUTE, BAN, UNBAN] or entry.target is None:
+            return found, discarded
+
+        key = (entry.action, entry.target.id)
+        if key in infractions and infractions[key][0](entry):
+            # we found it, dispatch the event
+            found += 1
+            infractions.pop(key)
+            self._dispatch_audit_log_entry(guild_id, key, entry)
+
+        # if it's a ban, make sure we don't have any events looking for a kick that doesn't exist.
+        if entry.action == BAN:
+            if (k := (KICK, entry.target.id)) in infractions:
+                discarded += 1
+                infractions.pop(k)
+                self._dispatch_audit_log_entry(guild_id, k, entry)
+
+        return found, discarded
+
+    def _take_due_requests(self):
+        """Takes the requests the poller should handle out of _audit_log_requests."""
+        to_check = defaultdict(dict)
+        discarded = 0
+        now = time.monotonic()
+        for guild_id, requests in self._audit_log_requests.items():
+            if guild_id in self._audit_fetch_tasks:  # picked up when that fetch is done
+                continue
+            for key, (check, requested_at) in requests.copy().items():
+                if now - requested_at > AUDIT_LOG_TIMEOUT:  # nobody's waiting anymore
+                    requests.pop(key)
                     continue
-                key = (entry.action, entry.target.id)
-                if key in infractions and infractions[key](
-                    entry
-                ):  # we found it, dispatch the event
-                    found += 1
-                    infractions.pop(key)
-                    self.bot.dispatch(
-                        f"fetched_audit_log_entry_{guild_id}",
-                        FetchedAuditLogEntry(guild_id, key, entry),
-                    )
-
-                # if it's a ban, make sure we don't have any events looking for a kick that doesn't exist.
-                if entry.action == BAN:
-                    if (k := KICK, entry.user.id) in infractions:
-                        discarded += 1
-                        infractions.pop(k)
-                        self.bot.dispatch(
-                            f"fetched_audit_log_entry_{guild_id}",
-                            FetchedAuditLogEntry(guild_id, k, entry),
-                        )
+                if self._request_due_at(guild_id, requested_at) > now:
+                    continue
+                # kicks always show up on the gateway right away, so the member left
+                if self.gateway_mode and key[0] == KICK:
+                    discarded += 1
+                    requests.pop(key)
+                    self._dispatch_audit_log_entry(guild_id, key, None)
+                    continue
+                self.queue_times.add(now - requested_at)
+                to_check[guild_id][key] = requests.pop(key)
+        for guild_id in [g for g, r in self._audit_log_requests.items() if not r]:
+            del self._audit_log_requests[guild_id]
+        return to_check, discarded
+
+    async def _fetch_guild_audit_log(self, guild_id, infractions):
+        """Resolves what it can of one guild's requests from its audit log.
+        Returns (found, discarded), or None if the audit log couldn't be fetched."""
+        guild = self.bot.get_guild(guild_id)
+        if guild is None:  # left the guild, nothing to log to anyway
+            infractions.clear()
+            return 0, 0
+
+        # anything the gateway or an earlier pass already saw doesn't need a request
+        found = discarded = 0
+        for key, (check, _) in infractions.copy().items():
+            entry = self._claim_recent_entry(guild_id, *key, check)
+            if entry:
+                infractions.pop(key)
+                self._dispatch_audit_log_entry(guild_id, key, entry)
+                if entry.action == key[0]:
+                    self.entries_from_cache += 1
+                else:  # a ban, not a kick
+                    discarded += 1
+        if not infractions:
+            return found, discarded
 
-                if not infractions:
-                    break
+        cursor = self._audit_log_cursors.get(guild_id)
+        oldest = disnake.utils.time_snowflake(
+            disnake.utils.utcnow() - datetime.timedelta(seconds=AUDIT_CURSOR_MAX_AGE)
+        )
+        if cursor and cursor > oldest:
+            # only what's new since last time, oldest first
+            entries = guild.audit_logs(
+                limit=AUDIT_LOG_PAGE_SIZE,
+                after=disnake.Object(cursor),
+                oldest_first=True,
+            )
+        else:
+            # a whole page (still one request), the cursor ends up past everything
+            # older than the newest entry, so anything left out would never be read
+            entries = guild.audit_logs(limit=AUDIT_LOG_PAGE_SIZE)
 
-        for guild_id, infractions in to_check.items():
-            for action_type, user_id in infractions.copy():
-                if action_type == KICK:
-                    discarded += 1
-                    infractions.pop((action_type, user_id))
-                    self.bot.dispatch(
-                        f"fetched_audit_log_entry_{guild_id}",
-                        FetchedAuditLogEntry(guild_id, (action_type, user_id), None),
+        async with self._audit_fetch_semaphore:
+            t0 = time.monotonic()
+            try:
+                async for entry in entries:
+                    self._audit_log_cursors[guild_id] = max(
+                        entry.id, self._audit_log_cursors.get(guild_id, 0)
                     )
-                else:
-                    check = infractions[action_type, user_id]
-                    key = (action_type, guild_id, user_id, check)
-                    logger.debug(
-                        f"putting missed infraction {key[:3]} back in fetch queue."
+                    f, d = self._resolve_requests(guild_id, infractions, entry)
+                    # lookups that aren't due yet can be answered by the same page
+                    pending = self._audit_log_requests.get(guild_id)
+                    if pending:
+                        pf, pd = self._resolve_requests(guild_id, pending, entry)
+                        f, d = f + pf, d + pd
+                    found += f
+                    discarded += d
+                    if not f:  # might be what a later request is looking for
+                        self._remember_entry(guild_id, entry)
+            except disnake.HTTPException as e:
+                self.audit_fetch_errors[guild_id] += 1
+                if e.status == 429:
+                    self.audit_fetch_rate_limits[guild_id] += 1
+                    retry_after = e.response.headers.get("Retry-After")
+                    cooldown = (
+                        float(retry_after)
+                        if retry_after
+                        else DEFAULT_RATE_LIMIT_COOLDOWN
                     )
-                    self._audit_log_queue.append(key)
+                    self._audit_fetch_cooldowns[guild_id] = time.monotonic() + cooldown
+                    if e.response.headers.get("X-RateLimit-Global"):
+                        self._audit_fetch_global_cooldown = time.monotonic() + cooldown
+                elif e.status in (401, 403):
+                    # no access to the audit log, asking again won't help
+                    self._fail_requests(guild_id, infractions, e)
+                logger.warning(
+                    f"failed to fetch audit log for guild {guild_id}: "
+                    f"{e.__class__.__name__}: {e.text}"
+                )
+                return None
+            finally:
+                self.audit_fetch_times[guild_id].add(time.monotonic() - t0)
+        self._audit_fetch_cooldowns[guild_id] = (
+            time.monotonic() + MIN_GUILD_FETCH_INTERVAL
+        )
+        return found, discarded
+
+    async def _audit_log_fetcher(self):
+        to_check, discarded = self._take_due_requests()
+        if discarded:
+            logger.debug(f"{discarded} kicks never showed up, the members left.")
+
+        # every guild gets its own task, so a slow guild (or one disnake is sleeping
+        # through a rate limit for) doesn't hold up the others. a guild that still has
+        # a fetch running isn't scheduled again until it's done
+        for guild_id, infractions in to_check.items():
+            task = asyncio.create_task(
+                self._poll_guild_audit_log(guild_id, infractions)
+            )
+            self._audit_fetch_tasks[guild_id] = task
+            task.add_done_callback(
+                lambda _, guild_id=guild_id: self._audit_fetch_done(guild_id)
+            )
+
+    def _audit_fetch_done(self, guild_id):
+        self._audit_fetch_tasks.pop(guild_id, None)
+        # whatever it put back (or got requested meanwhile) might be due now
+        self._audit_requests_added.set()
+
+    async def _poll_guild_audit_log(self, guild_id, infractions):
+        t0 = time.monotonic()
+        try:
+            result = await self._fetch_guild_audit_log(guild_id, infractions)
+        except Exception:
+            logger.exception(f"failed to fetch audit log for guild {guild_id}")
+            result = None
+
+        now = time.monotonic()
+        if result is None:  # try again next time, but not right away
+            for key, request in infractions.items():
+                self._audit_log_requests[guild_id].setdefault(key, request)
+            self._back_off(guild_id, now)
+            return
+        found, discarded = result
+        self.entries_from_polling += found
+
+        for key, request in infractions.copy().items():
+            if key[0] == KICK and now - request[1] >= KICK_ENTRY_WAIT:
+                discarded += 1
+                infractions.pop(key)
+                self._dispatch_audit_log_entry(guild_id, key, None)
+            else:
+                logger.debug(
+                    f"putting missed infraction {(key[0], guild_id, key[1])} back in fetch queue."
+                )
+                self._audit_log_requests[guild_id].setdefault(key, request)
+
+        # back off from guilds whose entries aren't showing up yet
+        if infractions:
+            self._back_off(guild_id, now)
+        else:
+            self._audit_miss_streaks.pop(guild_id, None)
 
-        missed = sum(len(infs) for infs in to_check.values())
+        missed = len(infractions)
         dt = time.monotonic() - t0
 
         if found or missed:
             logger.info(
-                f"fetched {found} audit log entries, unable to find {missed}, discarded {discarded}. task ran in {dt} seconds."
+                f"fetched {found} audit log entries for guild {guild_id}, unable to find {missed}, discarded {discarded}. task ran in {dt} seconds."
             )
 
-        return found, missed
+    @Cog.listener()
+    async def on_audit_log_entry_create(self, entry):
+        if not self.gateway_mode or entry.action not in [KICK, MUTE, BAN, UNBAN]:
+            return
+        requests = self._audit_log_requests.get(entry.guild.id, {})
+        found, _ = self._resolve_requests(entry.guild.id, requests, entry)
+        self.entries_from_gateway += found
+        if not found:  # the member event might not have arrived yet
+            self._remember_entry(entry.guild.id, entry)
+
+    def _remember_entry(self, guild_id, entry):
+        if entry.action not in [KICK, MUTE, BAN, UNBAN]:
+            return
+        entries = self._recent_audit_entries[guild_id]
+        if not any(e.id == entry.id for e in entries):
+            entries.append(entry)
+
+    def _claim_recent_entry(self, guild_id, action_type, user_id, check):
+        """Finds (and removes) a recent gateway entry that answers a request."""
+        entries = self._recent_audit_entries.get(guild_id)
+        if not entries:
+            return None
+        now = disnake.utils.utcnow()
+        for i in range(len(entries) - 1, -1, -1):  # newest first
+            entry = entries[i]
+            if (now - entry.created_at).total_seconds() > RECENT_ENTRY_MAX_AGE:
+                break
+            if entry.target is None or entry.target.id != user_id:
+                continue
+            if action_type == KICK and entry.action == BAN:
+                return entry  # it's a ban, not a kick (but don't claim it)
+            if entry.action == action_type and check(entry):
+                del entries[i]
+                return entry
+        return None
 
     async def fetch_audit_log_entry(
         self, action_type, guild, user, check=lambda _: True
     ):
-        inf = (action_type, guild.id, user.id, check)
         key = (action_type, user.id)
-        self._audit_log_queue.append(inf)
-        try:
-            entry = await self.bot.wait_for(
-                f"fetched_audit_log_entry_{guild.id}",
-                check=lambda e: e.key == key,
-                timeout=30,
+        waiter_key = (guild.id, action_type, user.id)
+        t0 = time.monotonic()
+
+        entry = self._claim_recent_entry(guild.id, action_type, user.id, check)
+        if entry:
+            self.entries_from_cache += 1
+            self.correlation_times.add(time.monotonic() - t0)
+            return entry
+
+        self._audit_log_requests[guild.id][key] = (check, t0)
+        self._audit_requests_added.set()
+        future = self._audit_log_waiters.get(waiter_key)
+        if future is None:  # otherwise someone's already waiting on the same entry
+            future = self._audit_log_waiters[waiter_key] = (
+                asyncio.get_running_loop().create_future()
             )
-            return entry.the_real_entry
+            self._audit_log_waiter_counts[waiter_key] = 0
+            self.peak_waiters = max(self.peak_waiters, len(self._audit_log_waiters))
+        self._audit_log_waiter_counts[waiter_key] += 1
+        try:
+            # shielded so one waiter timing out doesn't cancel it for the others
+            entry = await asyncio.wait_for(asyncio.shield(future), AUDIT_LOG_TIMEOUT)
+            self.correlation_times.add(time.monotonic() - t0)
+            return entry
         except asyncio.TimeoutError:
+            self.waiter_timeouts += 1
             if action_type != KICK:
                 raise Exception(
-                    f"timed out for {tuple(str(i) for i in inf[:3])}."
+                    f"timed out for {tuple(str(i) for i in waiter_key)}."
                 ) from None
             return None
+        finally:
+            # the lookup stays around until the last caller waiting on it gives up
+            if self._audit_log_waiters.get(waiter_key) is future:
+                self._audit_log_waiter_counts[waiter_key] -= 1
+                if not self._audit_log_waiter_counts[waiter_key]:
+                    self._pop_waiter(waiter_key)
+                    self._audit_log_requests[guild.id].pop(key, None)
+
+    @command()
+    @bot_admin()
+    async def auditstats(self, ctx):
+        """View audit log correlation statistics."""
+        pending = sum(len(r) for r in self._audit_log_requests.values())
+        recent = sum(len(e) for e in self._recent_audit_entries.values())
+        mode = "gateway" if self.gateway_mode else "polling"
+        await ctx.send(
+            f"```\n"
+            f"mode: {mode}\n"
+            f"pending requests: {pending}\n"
+            f"waiters: {len(self._audit_log_waiters)} (peak {self.peak_waiters}), "
+            f"{self.waiter_timeouts} timed out\n"
+            f"unclaimed recent entries: {recent}\n"
+            f"resolved from gateway: {self.entries_from_gateway}\n"
+            f"resolved from polling: {self.entries_from_polling}\n"
+            f"resolved from recent entries: {self.entries_from_cache}\n"
+            f"queue time: {self.queue_times.show()}\n"
+            f"  {self.queue_times.histogram(HISTOGRAM_BOUNDS)}\n"
+            f"correlation time: {self.correlation_times.show()}\n"
+            f"  {self.correlation_times.histogram(HISTOGRAM_BOUNDS)}\n"
+            f"audit log fetches: {len(self._audit_fetch_tasks)} in flight, "
+            f"{self._audit_fetch_overview()}\n"
+            f"```"
+        )
+
+    def _audit_fetch_overview(self, n=5):
+        # the slowest guilds (by p99) are the interesting ones
+        slowest = sorted(
+            self.audit_fetch_times.items(),
+            key=lambda item: item[1].percentile(99),
+            reverse=True,
+        )[:n]
+        lines = [f"{len(self.audit_fetch_times)} guilds"]
+        for guild_id, timings in slowest:
+            lines.append(
+                f"  {guild_id}: {timings.show()}, errors={self.audit_fetch_errors[guild_id]}, "
+                f"rate limited={self.audit_fetch_rate_limits[guild_id]}"
+            )
+        return "\n".join(lines)
 
     async def mass_action_filter(self, type, guild, user, mod):
         # TODO: implement mass_action_filter (for automatically detecting mass actions by other bots)
@@ -252,7 +593,6 @@ class Modlog(Cog):
 
         logger.debug("ban detected")
         moderator = reason = note = duration = None
-        await asyncio.sleep(2)
 
         entry = await self.fetch_audit_log_entry(BAN, guild, user)
         if entry:
@@ -282,7 +622,6 @@ class Modlog(Cog):
             return
 
         logger.debug("possible kick detected")
-        await asyncio.sleep(2)
 
         entry = await self.fetch_audit_log_entry(KICK, guild, member)
 
@@ -320,7 +659,6 @@ class Modlog(Cog):
 
         member = before
         mute_role = guild.get_role(config.mute_role_id)
-        await asyncio.sleep(2)
 
         if mute_role in before.roles and mute_role not in after.roles:  # unmute
             logger.debug("detected unmute")
@@ -389,7 +727,6 @@ class Modlog(Cog):
             return
 
         logger.debug("unban detected")
-        await asyncio.sleep(2)
 
         entry = await self.fetch_audit_log_entry(UNBAN, guild, user)
 
@@ -0,0 +1,118 @@
+import asyncio
+import time
+from collections import deque
+
+
+class CircuitOpen(Exception):
+    """Raised instead of making a call while the circuit breaker is open."""
+
+    def __init__(self, name):
+        self.name = name
+        super().__init__(f"circuit breaker for {name} is open")
+
+
+class CircuitBreaker:
+    """Stops calling a failing service for a while instead of piling up slow requests.
+
+    Every call gets a latency budget (a call that runs over it counts as a failure).
+    Once at least min_calls of the last `window` calls have finished and
+    failure_threshold of them failed, the breaker opens and calls fail fast with
+    CircuitOpen. After reset_timeout seconds it lets a single probe call through
+    (half-open): if that succeeds the breaker closes again, otherwise it re-opens.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(
+        self,
+        name,
+        timeout,
+        *,
+        failure_threshold=0.5,
+        window=20,
+        min_calls=5,
+        reset_timeout=30,
+    ):
+        self.name = name
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+
+        self.state = self.CLOSED
+        self._results = deque(maxlen=window)  # True for success
+        self._opened_at = 0
+        self._probing = False
+
+        self.calls = 0
+        self.failures = 0
+        self.rejected = 0
+        self.trips = 0
+
+    def allow(self):
+        if self.state == self.OPEN:
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self.state = self.HALF_OPEN
+            self._probing = False
+        if self.state == self.HALF_OPEN:
+            if self._probing:
+                return False
+            self._probing = True
+        return True
+
+    def record_success(self):
+        if self.state == self.OPEN:  # a call from before the breaker opened
+            return
+        if self.state == self.HALF_OPEN:
+            self.state = self.CLOSED
+            self._results.clear()
+        self._results.append(True)
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.OPEN:
+            return
+        if self.state == self.HALF_OPEN:
+            self._trip()
+            return
+        self._results.append(False)
+        failed = self._results.count(False)
+        if (
+            len(self._results) >= self.min_calls
+            and failed / len(self._results) >= self.failure_threshold
+        ):
+            self._trip()
+
+    def _trip(self):
+        self.state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._probing = False
+        self.trips += 1
+
+    async def call(self, func, *args, timeout=None):
+        if not self.allow():
+            self.rejected += 1
+            raise CircuitOpen(self.name)
+
+        self.calls += 1
+        try:
+            result = await asyncio.wait_for(func(*args), timeout or self.timeout)
+        except asyncio.CancelledError:
+            # not the service's fault, let the next call probe instead
+            if self.state == self.HALF_OPEN:
+                self._probing = False
+            raise
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+    def stats(self):
+        return (
+            f"state={self.state}, calls={self.calls}, failures={self.failures}, "
+            f"rejected={self.rejected}, trips={self.trips}"
+        )
@@ -0,0 +1,104 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+# returned by TTLCache.get on a miss, so None can be cached as a value
+MISSING = object()
+
+
+class TTLCache:
+    """Bounded LRU cache where every entry expires after its own TTL."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # {key: (expires_at, value)}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return self.get(key, count=False) is not MISSING
+
+    def get(self, key, default=MISSING, *, count=True):
+        try:
+            expires_at, value = self._data[key]
+        except KeyError:
+            if count:
+                self.misses += 1
+            return default
+
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.expirations += 1
+            if count:
+                self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        if count:
+            self.hits += 1
+        return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key, default=None):
+        try:
+            return self._data.pop(key)[1]
+        except KeyError:
+            return default
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self):
+        return (
+            f"size={len(self)}/{self.maxsize}, hits={self.hits}, misses={self.misses}, "
+            f"evictions={self.evictions}, expirations={self.expirations}"
+        )
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into one in-flight task."""
+
+    def __init__(self):
+        self._in_flight = {}  # {key: Task}
+
+        self.calls = 0
+        self.shared = 0
+
+    def __len__(self):
+        return len(self._in_flight)
+
+    async def do(self, key, func, *args):
+        task = self._in_flight.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.create_task(func(*args))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        else:
+            self.shared += 1
+
+        # shield so one caller being cancelled doesn't cancel it for everyone else
+        return await asyncio.shield(task)
+
+    def _done(self, key, task):
+        self._in_flight.pop(key, None)
+        # mark the exception as retrieved in case every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self):
+        return f"in_flight={len(self)}, calls={self.calls}, shared={self.shared}"
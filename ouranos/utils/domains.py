@@ -0,0 +1,163 @@
+from functools import lru_cache
+from urllib.parse import urlsplit, urlunsplit
+
+DEFAULT_PORTS = {"http": "80", "https": "443"}
+
+PUBLIC_SUFFIX_FILE = "public_suffix_list.dat"
+
+
+def hostname(netloc):
+    """Strips userinfo and port from a netloc and lowercases it."""
+    host = netloc.rpartition("@")[2] if "@" in netloc else netloc
+    if host.startswith("["):  # ipv6 literal
+        return host.partition("]")[0] + "]"
+    if ":" in host:
+        host = host.partition(":")[0]
+    return host.rstrip(".").lower()
+
+
+def _decode_label(label):
+    if label.startswith("xn--"):
+        try:
+            return label[4:].encode("ascii").decode("punycode")
+        except (UnicodeError, ValueError):
+            pass
+    return label
+
+
+def normalize_host(netloc):
+    """Lowercases a netloc, strips userinfo and port, and IDNA-decodes it."""
+    host = hostname(netloc)
+    if "xn--" in host:
+        host = ".".join(_decode_label(label) for label in host.split("."))
+    return host
+
+
+def is_ip_address(host):
+    return host.startswith("[") or host.replace(".", "").isdigit()
+
+
+def normalize_url(url):
+    """Normalizes a URL for use as a cache key.
+
+    Lowercases the scheme and host, drops default ports and the fragment.
+    The path and query are left alone, since shortener ids are case-sensitive.
+    """
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = hostname(parts.netloc)
+    try:
+        port = parts.port
+    except ValueError:  # not a number
+        port = None
+    if port is not None and str(port) != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+    return urlunsplit((scheme, host, parts.path or "/", parts.query, ""))
+
+
+class DomainSuffixIndex:
+    """Trie of reversed domain labels.
+
+    Matches a host if it is one of the indexed domains or a subdomain of one,
+    in time proportional to the number of labels in the host.
+    """
+
+    _END = object()
+
+    def __init__(self, domains=()):
+        self._root = {}
+        self._size = 0
+        for domain in domains:
+            self.add(domain)
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, host):
+        return self.match(host) is not None
+
+    def add(self, domain):
+        domain = domain.strip().rstrip(".").lower()
+        if not domain:
+            return
+        node = self._root
+        for label in reversed(domain.split(".")):
+            node = node.setdefault(label, {})
+        if self._END not in node:
+            node[self._END] = domain
+            self._size += 1
+
+    def match(self, host):
+        """Returns the indexed domain that host falls under, or None."""
+        node = self._root
+        for label in reversed(hostname(host).split(".")):
+            node = node.get(label)
+            if node is None:
+                return None
+            if self._END in node:
+                return node[self._END]
+        return None
+
+
+class PublicSuffixList:
+    """Public suffix rules, for finding the registrable domain of a host.
+
+    See https://publicsuffix.org/list/ for the format.
+    """
+
+    def __init__(self, lines):
+        self.rules = set()
+        self.wildcards = set()  # "*.ck" is stored as "ck"
+        self.exceptions = set()  # "!www.ck" is stored as "www.ck"
+        for line in lines:
+            rule = line.strip().lower()
+            if not rule or rule.startswith("//"):
+                continue
+            if rule.startswith("!"):
+                self.exceptions.add(rule[1:])
+            elif rule.startswith("*."):
+                self.wildcards.add(rule[2:])
+            else:
+                self.rules.add(rule)
+
+    def __len__(self):
+        return len(self.rules) + len(self.wildcards) + len(self.exceptions)
+
+    def suffix_length(self, labels):
+        """Returns how many trailing labels make up the public suffix."""
+        n = len(labels)
+        for i in range(n):  # longest candidate first
+            candidate = ".".join(labels[i:])
+            if candidate in self.exceptions:
+                return n - i - 1
+            if candidate in self.rules or ".".join(labels[i + 1 :]) in self.wildcards:
+                return n - i
+        return 1  # default rule: the tld
+
+    def registrable_domain(self, host):
+        """Returns the registrable domain of a normalized host, or None."""
+        if is_ip_address(host):
+            return None
+        labels = host.split(".")
+        length = self.suffix_length(labels)
+        if len(labels) <= length:
+            return None
+        return ".".join(labels[-(length + 1) :])
+
+    def lookup_candidates(self, host):
+        """Returns the host and each of its parents, down to the registrable domain."""
+        registrable = self.registrable_domain(host)
+        if not registrable:
+            return [host]
+        candidates = [host]
+        while host != registrable:
+            host = host.partition(".")[2]
+            candidates.append(host)
+        return candidates
+
+
+@lru_cache(maxsize=None)
+def load_public_suffixes(file=PUBLIC_SUFFIX_FILE):
+    """Loads (once) the public suffix list shipped with the bot."""
+    with open(file, "r", encoding="utf-8") as f:
+        return PublicSuffixList(f.read().splitlines())
@@ -0,0 +1,123 @@
+import fcntl
+import hashlib
+import mmap
+import os
+from array import array
+from bisect import bisect_left
+
+# file format: MAGIC, then a sorted array of unique native-endian uint64 domain hashes
+MAGIC = b"OPHIDX01"
+
+
+def domain_hash(domain):
+    return int.from_bytes(
+        hashlib.blake2b(domain.encode(), digest_size=8).digest(), "little"
+    )
+
+
+class DomainHashIndex:
+    """Read-only, memory-mapped set of domain hashes.
+
+    Every process that opens the same file shares its pages, and lookups are a
+    binary search over the mapped array. The file is only ever replaced with an
+    atomic rename (see write), so refresh() can swap to a new version at any time
+    without blocking lookups.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+        self._mmap = None
+        self._hashes = ()
+        self._version = None  # (st_ino, st_mtime_ns) of the mapped file
+        self._lock_file = None
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def __bool__(self):
+        return self._mmap is not None
+
+    def __contains__(self, domain):
+        h = domain_hash(domain)
+        hashes = self._hashes
+        i = bisect_left(hashes, h)
+        return i < len(hashes) and hashes[i] == h
+
+    @property
+    def mtime(self):
+        return self._version[1] / 1e9 if self._version else None
+
+    def refresh(self):
+        """Maps the latest version of the file. Returns True if it changed."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        version = (st.st_ino, st.st_mtime_ns)
+        if version == self._version:
+            return False
+
+        f = open(self.path, "rb")
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            f.close()
+            return False
+        if mm[: len(MAGIC)] != MAGIC:
+            mm.close()
+            f.close()
+            raise ValueError(f"{self.path} is not a domain index file")
+
+        old = self._file, self._mmap, self._hashes
+        self._file, self._mmap = f, mm
+        self._hashes = memoryview(mm)[len(MAGIC) :].cast("Q")
+        self._version = version
+        self._release(*old)
+        return True
+
+    def close(self):
+        self._release(self._file, self._mmap, self._hashes)
+        self._file = self._mmap = self._version = None
+        self._hashes = ()
+        if self._lock_file:
+            self._lock_file.close()
+            self._lock_file = None
+
+    @staticmethod
+    def _release(f, mm, hashes):
+        if isinstance(hashes, memoryview):
+            hashes.release()
+        if mm is not None:
+            mm.close()
+        if f is not None:
+            f.close()
+
+    def acquire_writer_lock(self):
+        """Tries to become the one process on this host that writes the index file."""
+        if self._lock_file:
+            return True
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        lock_file = open(f"{self.path}.lock", "w")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    @property
+    def is_writer(self):
+        return self._lock_file is not None
+
+    def write(self, domains):
+        """Writes a new version of the index and atomically renames it into place."""
+        hashes = array("Q", sorted({domain_hash(d) for d in domains}))
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(MAGIC)
+            hashes.tofile(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
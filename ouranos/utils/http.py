@@ -0,0 +1,118 @@
+import time
+from collections import OrderedDict
+
+import aiohttp
+
+from ouranos.utils.stats import Timings
+
+# shared connection pool for everything that talks to the outside world
+# (not discord itself, disnake has its own)
+POOL_LIMIT = 100
+POOL_LIMIT_PER_HOST = 10
+DNS_CACHE_TTL = 300
+KEEPALIVE_TIMEOUT = 30
+
+# default timeouts (seconds), callers can pass a tighter timeout per request
+TIMEOUT_TOTAL = 15
+TIMEOUT_CONNECT = 5
+TIMEOUT_SOCK_READ = 10
+
+# per-host metrics are kept for this many hosts (least recently used dropped first),
+# since links posted by users decide which hosts get requested
+MAX_TRACKED_HOSTS = 200
+
+
+session = None
+
+
+class HostStats:
+    def __init__(self):
+        self.times = Timings(100)
+        self.errors = 0
+
+    @property
+    def requests(self):
+        return self.times.count + self.errors
+
+
+# {host: HostStats}, least recently used first
+hosts = OrderedDict()
+
+
+def host_stats(host):
+    stats = hosts.get(host)
+    if stats is None:
+        stats = hosts[host] = HostStats()
+        if len(hosts) > MAX_TRACKED_HOSTS:
+            hosts.popitem(last=False)
+    else:
+        hosts.move_to_end(host)
+    return stats
+
+
+async def _on_request_start(_session, ctx, params):
+    ctx.start = time.perf_counter()
+
+
+async def _on_request_end(_session, ctx, params):
+    host_stats(params.url.host).times.add(time.perf_counter() - ctx.start)
+
+
+async def _on_request_exception(_session, ctx, params):
+    host_stats(params.url.host).errors += 1
+
+
+def _trace_config():
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(_on_request_start)
+    trace_config.on_request_end.append(_on_request_end)
+    trace_config.on_request_exception.append(_on_request_exception)
+    return trace_config
+
+
+def init():
+    """Creates the shared session. Must be called with the event loop running."""
+    global session
+    if session is not None and not session.closed:
+        return session
+    connector = aiohttp.TCPConnector(
+        limit=POOL_LIMIT,
+        limit_per_host=POOL_LIMIT_PER_HOST,
+        ttl_dns_cache=DNS_CACHE_TTL,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+    )
+    timeout = aiohttp.ClientTimeout(
+        total=TIMEOUT_TOTAL, connect=TIMEOUT_CONNECT, sock_read=TIMEOUT_SOCK_READ
+    )
+    session = aiohttp.ClientSession(
+        connector=connector, timeout=timeout, trace_configs=[_trace_config()]
+    )
+    return session
+
+
+def get_session():
+    """Returns the shared session, creating it if needed."""
+    return init()
+
+
+async def close():
+    global session
+    if session is not None:
+        await session.close()
+        session = None
+
+
+def stats(n=10):
+    if session is None or session.closed:
+        pool = "closed"
+    else:
+        connector = session.connector
+        idle = sum(len(conns) for conns in connector._conns.values())
+        pool = (
+            f"active={len(connector._acquired)}, idle={idle}, limit={connector.limit}"
+        )
+    lines = [f"pool: {pool}", f"hosts: {len(hosts)} tracked, busiest:"]
+    busiest = sorted(hosts.items(), key=lambda item: item[1].requests, reverse=True)
+    for host, entry in busiest[:n]:
+        lines.append(f"  {host}: {entry.times.show()}, errors={entry.errors}")
+    return "\n".join(lines)
@@ -7,6 +7,7 @@ from disnake.webhook import Webhook
 from loguru import logger
 
 from auth import WEBHOOK_URL_PROD
+from ouranos.utils import http
 
 
 class InterceptHandler(logging.Handler):
@@ -33,6 +34,12 @@ def ouranos_or_main(r):
 
 
 async def webhook_log(msg):
+    if http.session is not None and not http.session.closed:
+        webhook = Webhook.from_url(WEBHOOK_URL_PROD, session=http.session)
+        await webhook.send(f"```\n{msg}\n```")
+        return
+
+    # before setup or after cleanup
     async with aiohttp.ClientSession() as session:
         webhook = Webhook.from_url(WEBHOOK_URL_PROD, session=session)
         await webhook.send(f"```\n{msg}\n```")
@@ -0,0 +1,117 @@
+import hashlib
+import re
+from collections import OrderedDict
+
+URL_PATTERN = re.compile(r"https?:/*\S+", re.IGNORECASE)
+MENTION_PATTERN = re.compile(r"<[@#][!&]?\d+>|@(?:everyone|here)")
+WORD_PATTERN = re.compile(r"\w+")
+DIGITS_PATTERN = re.compile(r"\d+")
+
+BITS = 64
+
+
+def tokenize(content):
+    """Splits a message into normalized words.
+
+    Links, mentions and numbers are replaced with placeholders, so messages
+    that only differ in which domain or user they point at look the same.
+    """
+    content = URL_PATTERN.sub(" xurlx ", content.casefold())
+    content = MENTION_PATTERN.sub(" xmentionx ", content)
+    content = DIGITS_PATTERN.sub("0", content)
+    return WORD_PATTERN.findall(content)
+
+
+def _feature_hash(feature):
+    return int.from_bytes(
+        hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little"
+    )
+
+
+def simhash(tokens):
+    """64-bit simhash of a message's words and word pairs."""
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    # transpose the hashes as bit strings, so counting set bits per column happens in C
+    columns = zip(*(f"{_feature_hash(f):064b}" for f in features))
+    threshold = len(features) / 2
+    fingerprint = 0
+    for column in columns:  # most significant bit first
+        fingerprint = fingerprint << 1 | (column.count("1") > threshold)
+    return fingerprint
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count("1")
+
+
+class SimhashIndex:
+    """Finds stored fingerprints within max_distance bits of a query.
+
+    Fingerprints are split into max_distance + 1 bands; any two fingerprints that
+    close must agree exactly on at least one band, so only entries sharing a band
+    with the query get compared. Seeded entries are kept forever, learned ones
+    are evicted oldest first once there are more than maxsize of them.
+    """
+
+    def __init__(self, max_distance=3, maxsize=5000):
+        self.max_distance = max_distance
+        self.maxsize = maxsize
+        self.bands = max_distance + 1
+        self._band_bits = BITS // self.bands
+        self._band_mask = (1 << self._band_bits) - 1
+
+        self._seeded = {}  # {fingerprint: label}
+        self._learned = OrderedDict()  # {fingerprint: label}
+        self._buckets = [{} for _ in range(self.bands)]  # [{band value: {fingerprint}}]
+
+    def __len__(self):
+        return len(self._seeded) + len(self._learned)
+
+    def _band_values(self, fingerprint):
+        for i in range(self.bands):
+            yield i, fingerprint >> (i * self._band_bits) & self._band_mask
+
+    def _index(self, fingerprint):
+        for i, value in self._band_values(fingerprint):
+            self._buckets[i].setdefault(value, set()).add(fingerprint)
+
+    def _unindex(self, fingerprint):
+        for i, value in self._band_values(fingerprint):
+            bucket = self._buckets[i][value]
+            bucket.discard(fingerprint)
+            if not bucket:
+                del self._buckets[i][value]
+
+    def seed(self, fingerprint, label):
+        if fingerprint in self._learned:
+            del self._learned[fingerprint]
+        elif fingerprint not in self._seeded:
+            self._index(fingerprint)
+        self._seeded[fingerprint] = label
+
+    def learn(self, fingerprint, label):
+        """Adds a fingerprint, returns False if it (or one close to it) is already known."""
+        if self.match(fingerprint) is not None:
+            return False
+        self._learned[fingerprint] = label
+        self._index(fingerprint)
+        while len(self._learned) > self.maxsize:
+            old, _ = self._learned.popitem(last=False)
+            self._unindex(old)
+        return True
+
+    def match(self, fingerprint):
+        """Returns the label of the closest stored fingerprint in range, or None."""
+        best, best_distance = None, self.max_distance + 1
+        seen = set()
+        for i, value in self._band_values(fingerprint):
+            for candidate in self._buckets[i].get(value, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                distance = hamming_distance(fingerprint, candidate)
+                if distance < best_distance:
+                    best, best_distance = candidate, distance
+        if best in self._seeded:
+            return self._seeded[best]
+        return self._learned.get(best)
@@ -1,3 +1,7 @@
+from bisect import bisect_left
+from collections import deque
+
+
 class Stats:
     messages_seen = 0
     commands_used = 0
@@ -24,3 +28,35 @@ class Stats:
     @classmethod
     def unique_guilds(cls):
         return len(cls.guilds)
+
+
+class Timings:
+    """Keeps the most recent timing samples (in seconds) for percentile reporting."""
+
+    def __init__(self, maxlen=1000):
+        self.samples = deque(maxlen=maxlen)
+        self.count = 0
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+
+    def percentile(self, p):
+        if not self.samples:
+            return 0.0
+        samples = sorted(self.samples)
+        return samples[min(len(samples) - 1, int(len(samples) * p / 100))]
+
+    def histogram(self, bounds):
+        """Counts the samples up to each bound (in seconds), and above the last one."""
+        counts = [0] * (len(bounds) + 1)
+        for sample in self.samples:
+            counts[bisect_left(bounds, sample)] += 1
+        labels = [f"<={b * 1000:g}ms" for b in bounds] + [f">{bounds[-1] * 1000:g}ms"]
+        return ", ".join(f"{label}: {count}" for label, count in zip(labels, counts))
+
+    def show(self):
+        return (
+            f"n={self.count}, p50={self.percentile(50) * 1000:.1f}ms, "
+            f"p99={self.percentile(99) * 1000:.1f}ms, max={self.percentile(100) * 1000:.1f}ms"
+        )
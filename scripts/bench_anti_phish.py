@@ -0,0 +1,272 @@
+"""Benchmark for the anti-phish pipeline (AntiPhish.get_domains / process_phishing).
+
+Replays synthetic message corpora through the pipeline against a local aiohttp
+stub that imitates phish.sinking.yachts and a set of URL shorteners, so no
+requests leave the machine. Every hostname resolves to the stub.
+
+Run from the repository root:
+    python scripts/bench_anti_phish.py [--latency MS] [--messages N] [--no-sync]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import socket
+import sys
+import tempfile
+import time
+import types
+from collections import Counter
+
+from aiohttp import ClientSession, TCPConnector, web
+from aiohttp.abc import AbstractResolver
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ouranos.cogs import anti_phish
+from ouranos.utils import http
+
+PHISH_DOMAINS = [f"free-nitro-{i}.gift" for i in range(2000)] + [
+    "steamcommunity-trade.ru",
+    "discord-app.click",
+]
+BENIGN_DOMAINS = [
+    "youtube.com",
+    "tenor.com",
+    "github.com",
+    "cdn.discordapp.com",
+    "twitter.com",
+    "reddit.com",
+    "en.wikipedia.org",
+    "imgur.com",
+]
+SHORTENER_HOSTS = ["bit.ly", "tinyurl.com", "t.co", "goo.gl"]
+
+# the cog writes its shared domain index here instead of ./data, which is the bot's
+# real (mounted) data directory in production. removed when the script exits
+INDEX_DIR = tempfile.TemporaryDirectory(prefix="bench_anti_phish_")
+
+CHAT = [
+    "lol",
+    "anyone up for a game later?",
+    "gm everyone",
+    "that patch note was wild",
+    "brb getting food",
+    "did you see the new episode",
+]
+
+
+class StubResolver(AbstractResolver):
+    """Resolves every hostname to localhost."""
+
+    async def resolve(self, host, port=0, family=socket.AF_INET):
+        return [
+            {
+                "hostname": host,
+                "host": "127.0.0.1",
+                "port": port,
+                "family": socket.AF_INET,
+                "proto": 0,
+                "flags": socket.AI_NUMERICHOST,
+            }
+        ]
+
+    async def close(self):
+        pass
+
+
+class StubServer:
+    """Imitates the phishing API and shortener redirects, with configurable latency."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.requests = Counter()
+        self.redirects = {}  # {code: location}
+        self.domains = set(PHISH_DOMAINS)
+        # what /recent returns, e.g. [{"type": "add", "domains": [...]}]
+        self.changes = []
+        self.port = None
+
+        self.app = web.Application()
+        self.app.router.add_get("/v2/all", self.all)
+        self.app.router.add_get("/v2/recent/{seconds}", self.recent)
+        self.app.router.add_get("/v2/check/{domain}", self.check)
+        self.app.router.add_route("*", "/s/{code}", self.redirect)
+        self.app.router.add_route("*", "/{tail:.*}", self.page)
+        self.runner = web.AppRunner(self.app)
+
+    async def start(self):
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    async def _sleep(self):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def all(self, request):
+        self.requests["all"] += 1
+        await self._sleep()
+        return web.json_response(sorted(self.domains))
+
+    async def recent(self, request):
+        self.requests["recent"] += 1
+        await self._sleep()
+        return web.json_response(self.changes)
+
+    async def check(self, request):
+        self.requests["check"] += 1
+        await self._sleep()
+        return web.json_response(request.match_info["domain"] in self.domains)
+
+    async def redirect(self, request):
+        self.requests[f"redirect ({request.method})"] += 1
+        await self._sleep()
+        location = self.redirects.get(request.match_info["code"])
+        if location is None:
+            raise web.HTTPNotFound()
+        raise web.HTTPFound(location)
+
+    async def page(self, request):
+        self.requests[f"page ({request.method})"] += 1
+        await self._sleep()
+        return web.Response(text="hello")
+
+
+def build_corpora(stub, n):
+    rand = random.Random(0)
+    port = stub.port
+
+    def link(domain):
+        return f"https://{domain}/{rand.randrange(10**6)}"
+
+    def short_link(target):
+        code = f"{rand.randrange(16**8):08x}"
+        # phishing landing pages should never actually get requested
+        netloc = target if target in stub.domains else f"{target}:{port}"
+        stub.redirects[code] = f"http://{netloc}/landing"
+        return f"http://{rand.choice(SHORTENER_HOSTS)}:{port}/s/{code}"
+
+    clean = [rand.choice(CHAT) for _ in range(n)]
+    link_heavy = [
+        f"{rand.choice(CHAT)} "
+        + " ".join(link(rand.choice(BENIGN_DOMAINS)) for _ in range(rand.randint(1, 5)))
+        for _ in range(n)
+    ]
+    # a few dozen distinct short links, reposted over and over
+    short_links = [
+        short_link(rand.choice(PHISH_DOMAINS + BENIGN_DOMAINS)) for _ in range(50)
+    ]
+    shortener_spam = [
+        f"free nitro!! {rand.choice(short_links)} @everyone" for _ in range(n)
+    ]
+    raid_message = f"steam gift for you {link('steamcommunity-trade.ru')}"
+    raid = [raid_message] * n
+
+    return {
+        "clean chat": (clean, False),
+        "link-heavy chat": (link_heavy, False),
+        "shortener spam": (shortener_spam, False),
+        "raid burst": (raid, True),
+    }
+
+
+async def make_cog(stub, sync):
+    anti_phish.PHISH_API = f"http://127.0.0.1:{stub.port}/v2"
+    anti_phish.PHISH_INDEX_FILE = os.path.join(INDEX_DIR.name, "phish_domains.idx")
+    cog = anti_phish.AntiPhish(types.SimpleNamespace(loop=asyncio.get_running_loop()))
+    cog._sync_phish_domains.cancel()
+
+    cog.session = ClientSession(connector=TCPConnector(resolver=StubResolver()))
+
+    if sync:
+        await cog.sync_phish_domains()
+    return cog
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+async def run_scenario(stub, name, messages, burst, sync):
+    cog = await make_cog(stub, sync)
+    stub.requests.clear()
+    latencies = []
+
+    async def scan(content):
+        t0 = time.perf_counter()
+        await cog.process_phishing(content)
+        latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    if burst:  # everything arrives at once
+        await asyncio.gather(*(scan(m) for m in messages))
+    else:
+        for m in messages:
+            await scan(m)
+    elapsed = time.perf_counter() - t0
+
+    await cog.cleanup()
+    await cog.session.close()
+
+    requests = ", ".join(f"{k}={v}" for k, v in sorted(stub.requests.items()))
+    print(
+        f"{name:<18}{len(messages) / elapsed:>12,.0f}"
+        f"{percentile(latencies, 50) * 1000:>10.3f}"
+        f"{percentile(latencies, 99) * 1000:>10.3f}"
+        f"  {sum(stub.requests.values()):>6}  {requests}"
+    )
+
+
+def bench_get_domains(corpora, number=5):
+    cog = anti_phish.AntiPhish.__new__(anti_phish.AntiPhish)
+    print(f"\n{'get_domains':<18}{'msg/s':>12}")
+    for name, (messages, _) in corpora.items():
+        t0 = time.perf_counter()
+        for _ in range(number):
+            for m in messages:
+                cog.get_domains(m)
+        elapsed = time.perf_counter() - t0
+        print(f"{name:<18}{len(messages) * number / elapsed:>12,.0f}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=50, help="stub latency (ms)")
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument(
+        "--no-sync",
+        action="store_true",
+        help="don't load the domain list first (use the /check API)",
+    )
+    args = parser.parse_args()
+
+    stub = StubServer(args.latency / 1000)
+    await stub.start()
+    corpora = build_corpora(stub, args.messages)
+
+    mode = "API fallback" if args.no_sync else "local domain list"
+    print(
+        f"process_phishing ({mode}, {args.latency:g}ms stub latency, "
+        f"{args.messages} messages per scenario)"
+    )
+    print(
+        f"{'scenario':<18}{'msg/s':>12}{'p50 ms':>10}{'p99 ms':>10}  {'reqs':>6}"
+        f"  outbound requests"
+    )
+    for name, (messages, burst) in corpora.items():
+        await run_scenario(stub, name, messages, burst, not args.no_sync)
+
+    bench_get_domains(corpora)
+    await http.close()
+    await stub.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,42 @@
+"""Micro-benchmark: shortener suffix index vs. the old str.startswith(tuple) check.
+
+Run from the repository root: python scripts/bench_shorteners.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ouranos.utils.domains import DomainSuffixIndex
+
+with open("shorteners.txt") as f:
+    shorteners = f.read().splitlines()
+
+as_tuple = tuple(shorteners)
+as_index = DomainSuffixIndex(shorteners)
+
+netlocs = [
+    "bit.ly",  # exact match, early in the list
+    "zsms.net",  # exact match, end of the list (lowercase, missed by startswith)
+    "www.bit.ly",  # subdomain, missed by startswith
+    "cdn.discordapp.com",  # no match
+    "media.tenor.com:443",  # no match, with port
+    "a.b.c.d.e.example.co.uk",  # no match, many labels
+]
+
+
+def main(number=100000):
+    print(f"{'netloc':<28}{'tuple (us)':>12}{'index (us)':>12}  tuple  index")
+    for netloc in netlocs:
+        t_tuple = timeit.timeit(lambda: netloc.startswith(as_tuple), number=number)
+        t_index = timeit.timeit(lambda: netloc in as_index, number=number)
+        print(
+            f"{netloc:<28}{t_tuple / number * 1e6:>12.3f}{t_index / number * 1e6:>12.3f}"
+            f"  {str(netloc.startswith(as_tuple)):<6} {netloc in as_index}"
+        )
+
+
+if __name__ == "__main__":
+    main()
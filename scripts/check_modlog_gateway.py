@@ -0,0 +1,338 @@
+"""Checks audit log correlation (Modlog.fetch_audit_log_entry) with stubbed events.
+
+Feeds fake AUDIT_LOG_ENTRY_CREATE events and a fake guild audit log to the modlog
+cog, with the real poller loop running, so nothing talks to discord. Timings are
+scaled down so the whole run takes a few seconds.
+
+Run from the repository root:
+    python scripts/check_modlog_gateway.py
+"""
+
+import asyncio
+import itertools
+import os
+import sys
+import time
+import types
+
+import disnake
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ouranos.cogs import modlog
+from ouranos.cogs.modlog import BAN, KICK, UNBAN
+
+GUILD_ID = 1
+MOD_ID = 99
+
+failures = 0
+# entries made in the same millisecond still need their own id
+entry_ids = itertools.count()
+
+
+def check(name, ok, detail=""):
+    global failures
+    if not ok:
+        failures += 1
+    print(f"{'ok' if ok else 'FAIL':<6}{name}{f'  ({detail})' if detail else ''}")
+
+
+class StubGuild:
+    """A guild whose audit log is whatever entries the check puts in it."""
+
+    def __init__(self, id=GUILD_ID):
+        self.id = id
+        self.entries = []  # oldest first
+        self.fetches = 0
+        self.status = None  # HTTP error status fetches fail with, if any
+        self.delay = 0  # seconds every fetch takes
+
+    async def audit_logs(self, limit=100, after=None, oldest_first=False):
+        self.fetches += 1
+        await asyncio.sleep(self.delay)
+        if self.status is not None:
+            response = types.SimpleNamespace(
+                status=self.status, reason="stubbed error", headers={}
+            )
+            error = disnake.Forbidden if self.status == 403 else disnake.HTTPException
+            raise error(response, "stubbed error")
+        entries = [e for e in self.entries if after is None or e.id > after.id]
+        if not oldest_first:
+            entries.reverse()
+        for entry in entries[:limit]:
+            yield entry
+
+
+def make_entry(guild, action, user_id):
+    now = disnake.utils.utcnow()
+    return types.SimpleNamespace(
+        id=disnake.utils.time_snowflake(now) + next(entry_ids),
+        action=action,
+        target=types.SimpleNamespace(id=user_id),
+        user=types.SimpleNamespace(id=MOD_ID),
+        guild=guild,
+        created_at=now,
+    )
+
+
+def make_cog(*guilds, gateway):
+    async def wait_until_ready():
+        pass
+
+    guilds = {guild.id: guild for guild in guilds}
+    bot = types.SimpleNamespace(
+        intents=disnake.Intents(bans=gateway, guilds=True),
+        get_guild=guilds.get,
+        wait_until_ready=wait_until_ready,
+    )
+    return modlog.Modlog(bot)
+
+
+def stop_cog(cog):
+    cog._ensure_audit_log_fetcher_alive.cancel()
+    if cog._audit_log_fetcher_task:
+        cog._audit_log_fetcher_task.cancel()
+
+
+async def request(cog, guild, action, user_id):
+    user = types.SimpleNamespace(id=user_id)
+    return asyncio.create_task(cog.fetch_audit_log_entry(action, guild, user))
+
+
+async def check_gateway():
+    guild = StubGuild()
+    cog = make_cog(guild, gateway=True)
+    await asyncio.sleep(0)  # let the poller start
+
+    # the entry shows up on the gateway after the member event asked for it
+    task = await request(cog, guild, BAN, 1)
+    await asyncio.sleep(0.01)
+    entry = make_entry(guild, BAN, 1)
+    await cog.on_audit_log_entry_create(entry)
+    result = await asyncio.wait_for(task, 1)
+    check("gateway entry after the request", result is entry)
+
+    # the entry shows up before anyone asks for it
+    entry = make_entry(guild, UNBAN, 2)
+    await cog.on_audit_log_entry_create(entry)
+    result = await asyncio.wait_for(await request(cog, guild, UNBAN, 2), 1)
+    check("gateway entry before the request", result is entry)
+
+    # a member "left" because they were banned, the kick lookup gets the ban
+    task = await request(cog, guild, KICK, 3)
+    await asyncio.sleep(0.01)
+    entry = make_entry(guild, BAN, 3)
+    await cog.on_audit_log_entry_create(entry)
+    result = await asyncio.wait_for(task, 1)
+    check("ban answers a kick lookup", result is entry and result.action == BAN)
+
+    # same, with the ban entry arriving first
+    entry = make_entry(guild, BAN, 4)
+    await cog.on_audit_log_entry_create(entry)
+    result = await asyncio.wait_for(await request(cog, guild, KICK, 4), 1)
+    check("earlier ban answers a kick lookup", result is entry)
+
+    # a kick that never shows up means the member left on their own
+    t0 = time.monotonic()
+    task = await request(cog, guild, KICK, 5)
+    result = await asyncio.wait_for(task, 2)
+    check(
+        "member leave resolves to None after the grace period",
+        result is None and time.monotonic() - t0 >= modlog.GATEWAY_GRACE_PERIOD,
+    )
+
+    check(
+        "gateway lookups don't fetch the audit log",
+        guild.fetches == 0,
+        f"{guild.fetches} fetches",
+    )
+
+    # a ban whose gateway event got lost is picked up by the poller
+    guild.entries.append(make_entry(guild, BAN, 6))
+    result = await asyncio.wait_for(await request(cog, guild, BAN, 6), 2)
+    check(
+        "poller fallback for a missing gateway event",
+        result is guild.entries[-1] and guild.fetches == 1,
+        f"{guild.fetches} fetches",
+    )
+
+    check(
+        "no requests left", not cog._audit_log_requests and not cog._audit_log_waiters
+    )
+    stop_cog(cog)
+
+
+async def check_polling():
+    guild = StubGuild()
+    cog = make_cog(guild, gateway=False)
+    await asyncio.sleep(0)
+
+    # without the intent every lookup goes through the poller, a burst shares a fetch
+    for user_id in (10, 11, 12):
+        guild.entries.append(make_entry(guild, BAN, user_id))
+    tasks = [await request(cog, guild, BAN, user_id) for user_id in (10, 11, 12)]
+    results = await asyncio.wait_for(asyncio.gather(*tasks), 2)
+    check(
+        "polling resolves a burst with one fetch",
+        results == guild.entries and guild.fetches == 1,
+        f"{guild.fetches} fetches",
+    )
+
+    # ban vs kick through the poller
+    guild.entries.append(make_entry(guild, BAN, 13))
+    result = await asyncio.wait_for(await request(cog, guild, KICK, 13), 2)
+    check("polling: ban answers a kick lookup", result is guild.entries[-1])
+
+    # a kick that isn't in the audit log after KICK_ENTRY_WAIT means the member left
+    result = await asyncio.wait_for(await request(cog, guild, KICK, 14), 3)
+    check("polling: member leave resolves to None", result is None)
+
+    stop_cog(cog)
+
+
+async def check_mass_ban(cursor):
+    guild = StubGuild()
+    cog = make_cog(guild, gateway=False)
+    await asyncio.sleep(0)
+    name = "mass ban " + ("after an earlier fetch" if cursor else "on the first fetch")
+
+    if cursor:  # the poller has read this guild's audit log before
+        guild.entries.append(make_entry(guild, BAN, 99))
+        await asyncio.wait_for(await request(cog, guild, BAN, 99), 2)
+
+    # a mass ban: the audit log has every entry while the member events are still
+    # trickling in, so a pass reads entries nobody asked for yet
+    timeout, modlog.AUDIT_LOG_TIMEOUT = modlog.AUDIT_LOG_TIMEOUT, 3
+    entries = [make_entry(guild, BAN, user_id) for user_id in range(100, 200)]
+    guild.entries += entries
+    tasks = []
+    for entry in entries:
+        tasks.append(await request(cog, guild, BAN, entry.target.id))
+        await asyncio.sleep(0.03)
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    resolved = sum(r is e for r, e in zip(results, entries))
+    check(
+        f"{name} resolves every lookup",
+        resolved == len(tasks),
+        f"{resolved}/{len(tasks)} resolved, {guild.fetches} fetches",
+    )
+    modlog.AUDIT_LOG_TIMEOUT = timeout
+
+    stop_cog(cog)
+
+
+async def check_slow_guild():
+    slow, fast = StubGuild(1), StubGuild(2)
+    cog = make_cog(slow, fast, gateway=False)
+    await asyncio.sleep(0)
+
+    # one guild's fetch hanging (e.g. disnake sleeping through a 429) doesn't
+    # hold up lookups in other guilds
+    slow.delay = 2
+    slow.entries.append(make_entry(slow, BAN, 40))
+    slow_task = await request(cog, slow, BAN, 40)
+    await asyncio.sleep(0.5)
+    fast.entries.append(make_entry(fast, BAN, 41))
+    t0 = time.monotonic()
+    result = await asyncio.wait_for(await request(cog, fast, BAN, 41), 3)
+    elapsed = time.monotonic() - t0
+    check(
+        "slow guild doesn't stall other guilds",
+        result is fast.entries[-1] and elapsed < 0.5,
+        f"{elapsed:.2f}s",
+    )
+    result = await asyncio.wait_for(slow_task, 3)
+    check("slow guild still resolves", result is slow.entries[-1])
+    check("one fetch per guild at a time", slow.fetches == 1, f"{slow.fetches} fetches")
+
+    stop_cog(cog)
+
+
+async def check_errors():
+    guild = StubGuild()
+    cog = make_cog(guild, gateway=False)
+    await asyncio.sleep(0)
+
+    # missing permissions: lookups fail instead of being retried
+    guild.status = 403
+    ban = await request(cog, guild, BAN, 20)
+    kick = await request(cog, guild, KICK, 21)
+    try:
+        await asyncio.wait_for(ban, 2)
+        check("forbidden fails ban lookups", False, "no error")
+    except disnake.Forbidden:
+        check("forbidden fails ban lookups", True)
+    except asyncio.TimeoutError:
+        check("forbidden fails ban lookups", False, "still retrying")
+    result = await asyncio.wait_for(kick, 2)
+    check("forbidden resolves kick lookups to None", result is None)
+    check(
+        "forbidden isn't retried",
+        guild.fetches == 1 and not cog._audit_log_requests,
+        f"{guild.fetches} fetches",
+    )
+
+    # other errors are retried, backing off like a miss
+    await asyncio.sleep(modlog.MAX_MISS_BACKOFF)
+    guild.status = 500
+    guild.fetches = 0
+    task = await request(cog, guild, BAN, 22)
+    await asyncio.sleep(1)
+    check(
+        "failed fetches back off",
+        0 < guild.fetches <= 1 / modlog.MAX_MISS_BACKOFF + 3,
+        f"{guild.fetches} fetches in 1s",
+    )
+    guild.status = None
+    guild.entries.append(make_entry(guild, BAN, 22))
+    result = await asyncio.wait_for(task, 2)
+    check("lookup resolves once fetches work again", result is guild.entries[-1])
+
+    stop_cog(cog)
+
+
+async def check_shared_waiters():
+    guild = StubGuild()
+    cog = make_cog(guild, gateway=True)
+    await asyncio.sleep(0)
+
+    # the first caller timing out mustn't take the lookup away from a later one
+    timeout, modlog.AUDIT_LOG_TIMEOUT = modlog.AUDIT_LOG_TIMEOUT, 0.5
+    first = await request(cog, guild, UNBAN, 30)
+    await asyncio.sleep(0.3)
+    second = await request(cog, guild, UNBAN, 30)
+    await asyncio.sleep(0.3)
+    check("first waiter times out", first.done() and first.exception() is not None)
+    entry = make_entry(guild, UNBAN, 30)
+    await cog.on_audit_log_entry_create(entry)
+    try:
+        result = await asyncio.wait_for(second, 1)
+    except Exception as e:
+        result = e
+    ok = result is entry
+    check("later waiter still gets the entry", ok, "" if ok else repr(result))
+    check("nothing left waiting", not cog._audit_log_waiters)
+    modlog.AUDIT_LOG_TIMEOUT = timeout
+
+    stop_cog(cog)
+
+
+async def main():
+    modlog.GATEWAY_GRACE_PERIOD = 0.2
+    modlog.AUDIT_BATCH_WINDOW = 0.05
+    modlog.MIN_GUILD_FETCH_INTERVAL = 0.05
+    modlog.MAX_MISS_BACKOFF = 0.2
+    modlog.KICK_ENTRY_WAIT = 0.3
+
+    await check_gateway()
+    await check_polling()
+    await check_mass_ban(cursor=False)
+    await check_mass_ban(cursor=True)
+    await check_slow_guild()
+    await check_errors()
+    await check_shared_waiters()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
+    sys.exit(1 if failures else 0)
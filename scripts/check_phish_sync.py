@@ -0,0 +1,120 @@
+"""Checks the phishing domain list sync (AntiPhish.sync_phish_domains) against a stub API.
+
+Does a full load, then applies /recent deltas that add and delete domains, and
+checks the writer's list, the shared on-disk index and a second (reader) cog.
+Uses the stub server from bench_anti_phish.py, so no requests leave the machine.
+
+Run from the repository root:
+    python scripts/check_phish_sync.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_anti_phish import StubServer, make_cog
+from ouranos.cogs import anti_phish
+from ouranos.utils import http
+
+ADDED = "brand-new-scam.gift"
+DELETED = "free-nitro-1.gift"
+KEPT = "free-nitro-2.gift"
+
+failures = 0
+
+
+def check(name, ok, detail=""):
+    global failures
+    if not ok:
+        failures += 1
+    print(f"{'ok' if ok else 'FAIL':<6}{name}{f'  ({detail})' if detail else ''}")
+
+
+def requests(stub):
+    return ", ".join(f"{k}={v}" for k, v in sorted(stub.requests.items()))
+
+
+def change(stub, type, domains):
+    """Changes the stub's list and reports it on /recent, like the real API."""
+    if type == "add":
+        stub.domains.update(domains)
+    else:
+        stub.domains.difference_update(domains)
+    stub.changes.append({"type": type, "domains": domains})
+
+
+async def verdicts(cog):
+    return {
+        domain: (await cog.process_phishing(f"look https://{domain}/x"))[0] == domain
+        for domain in (ADDED, DELETED, KEPT)
+    }
+
+
+async def main():
+    stub = StubServer(0)
+    await stub.start()
+
+    writer = await make_cog(stub, sync=True)
+    check("full load on startup", stub.requests["all"] == 1, requests(stub))
+    check(
+        "full load lists everything",
+        writer.is_listed(KEPT) and writer.is_listed(DELETED),
+    )
+
+    # the next sync only asks for what changed
+    stub.requests.clear()
+    change(stub, "add", [ADDED, "Another-Scam.GIFT"])
+    change(stub, "delete", [DELETED])
+    writer._last_sync = time.time() - anti_phish.SYNC_INTERVAL
+    await writer.sync_phish_domains()
+    check(
+        "delta sync uses /recent",
+        stub.requests == {"recent": 1},
+        requests(stub),
+    )
+    check("delta adds domains", writer.is_listed(ADDED))
+    check("delta normalizes domains", writer.is_listed("another-scam.gift"))
+    check("delta deletes domains", not writer.is_listed(DELETED))
+    check("delta keeps the rest", writer.is_listed(KEPT))
+
+    stub.requests.clear()
+    result = await verdicts(writer)
+    check(
+        "writer detects what the delta added, not what it deleted",
+        result == {ADDED: True, DELETED: False, KEPT: True},
+        str(result),
+    )
+    check("no lookups while in sync", not stub.requests, requests(stub))
+
+    # a second process only maps the index the writer keeps up to date
+    reader = await make_cog(stub, sync=False)
+    stub.requests.clear()
+    await reader.sync_phish_domains()
+    check("reader doesn't call the API", not stub.requests, requests(stub))
+    check("reader maps the index", reader._last_sync is not None)
+    result = await verdicts(reader)
+    check(
+        "reader sees the delta",
+        result == {ADDED: True, DELETED: False, KEPT: True},
+        str(result),
+    )
+
+    # syncing again with nothing new doesn't rewrite the index
+    stub.changes.clear()
+    mtime = writer.domain_index.mtime
+    await writer.sync_phish_domains()
+    check("empty delta leaves the index alone", writer.domain_index.mtime == mtime)
+
+    for cog in (reader, writer):
+        await cog.cleanup()
+        await cog.session.close()
+    await http.close()
+    await stub.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
+    sys.exit(1 if failures else 0)
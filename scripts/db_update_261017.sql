@@ -0,0 +1,4 @@
+-- add per-guild anti_phish allowlist to config
+
+ALTER TABLE config
+    ADD COLUMN anti_phish_allowlist text NOT NULL DEFAULT '';